@@ -0,0 +1,55 @@
+import time
+
+# A handful of real-world shaped lines, roughly matching the mix seen on a busy channel.
+SAMPLE_LINES = [
+    '@badge-info=subscriber/14;badges=subscriber/12,premium/1;client-nonce=a1b2c3d4e5f60718293a4b5c6d7e8f90;'
+    'color=#1E90FF;display-name=SomeViewer;emotes=25:0-4,12-16/1902:6-10;first-msg=0;flags=;'
+    'id=b34ccfc7-4977-403a-8a94-33c6bac34fb8;mod=0;returning-chatter=0;room-id=1337;subscriber=1;'
+    'tmi-sent-ts=1507246572675;turbo=0;user-id=1234567;user-type= '
+    ':someviewer!someviewer@someviewer.tmi.twitch.tv PRIVMSG #bar :Kappa Keepo Kappa',
+    '@badge-info=;badges=moderator/1;color=;display-name=ModUser;emotes=;first-msg=0;flags=;'
+    'id=f1f3c2a3-1b6e-4a5e-9d0b-0d8c4a9b2e11;mod=1;returning-chatter=0;room-id=1337;subscriber=0;'
+    'tmi-sent-ts=1507246572676;turbo=0;user-id=7654321;user-type=mod '
+    ':moduser!moduser@moduser.tmi.twitch.tv PRIVMSG #bar :please keep chat civil everyone',
+    '@badge-info=;badges=staff/1,broadcaster/1,turbo/1;color=#008000;display-name=ronni;emotes=;'
+    'id=db25007f-7a18-43eb-9379-80131e44d633;login=ronni;mod=0;msg-id=resub;msg-param-cumulative-months=6;'
+    'msg-param-streak-months=2;msg-param-should-share-streak=1;msg-param-sub-plan=Prime;'
+    'msg-param-sub-plan-name=Prime;room-id=1337;subscriber=1;'
+    'system-msg=ronni\\shas\\ssubscribed\\sfor\\s6\\smonths!;tmi-sent-ts=1507246572675;turbo=1;'
+    'user-id=1337;user-type=staff :tmi.twitch.tv USERNOTICE #dallas :Great stream -- keep it up!',
+    '@emote-only=0;followers-only=-1;r9k=0;room-id=1337;slow=0;subs-only=0 :tmi.twitch.tv ROOMSTATE #bar',
+    '@msg-id=msg_ratelimit :tmi.twitch.tv NOTICE #bar :Your message was not sent because you are sending '
+    'messages too quickly.',
+    ':someviewer!someviewer@someviewer.tmi.twitch.tv JOIN #bar',
+    'PING :tmi.twitch.tv',
+]
+
+
+def bench(func, lines, repeat=5, min_time=0.5):
+    """
+    Runs `func` over every line repeatedly, returning the best lines/sec rate
+    observed over `repeat` rounds of at least `min_time` seconds each.
+    """
+    best = 0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            for line in lines:
+                func(line)
+            count += len(lines)
+
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+
+        best = max(best, count / elapsed)
+    return best
+
+
+def report(name, results, baseline=None):
+    print(name)
+    base = results[baseline] if baseline else None
+    for label, rate in results.items():
+        extra = ' ({:.2f}x)'.format(rate / base) if base else ''
+        print('  {:<24} {:>12,.0f} lines/sec{}'.format(label, rate, extra))
@@ -0,0 +1,73 @@
+"""
+Compares the RFC3339 `datetime` converter against the previous strptime based
+implementation, on a mix of EventSub shaped timestamps.
+
+    python -m benchmarks.datetime_parse
+"""
+from datetime import datetime as real_datetime
+
+from benchmarks import bench, report
+from twitch.types.base import datetime, parse_rfc3339
+
+DATETIME_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%fZ'
+]
+
+# Twitch sends anything from no fraction up to nanoseconds
+SAMPLE_TIMESTAMPS = [
+    '2023-06-12T18:04:11.123456789Z',
+    '2023-06-12T18:04:11Z',
+    '2023-06-12T18:04:11.52Z',
+    '2023-06-12T18:04:11.5234567Z',
+    '2023-06-12T18:04:11.123456Z',
+]
+
+
+def legacy_datetime(data):
+    # The original converter, kept verbatim for comparison
+    if not data:
+        return None
+
+    if isinstance(data, int):
+        return real_datetime.utcfromtimestamp(data)
+
+    for fmt in DATETIME_FORMATS:
+        try:
+            return real_datetime.strptime(f"{data[:-2]}Z", fmt)
+        except (ValueError, TypeError):
+            continue
+
+    try:
+        return real_datetime.fromisoformat(data)
+    except (ValueError, TypeError):
+        raise ValueError('Failed to convert `{}` to datetime'.format(data))
+
+
+def uncached(data):
+    parse_rfc3339.cache_clear()
+    return datetime(data)
+
+
+def unique_timestamps(count=10000):
+    # Distinct values, so every parse misses the cache
+    return ['2023-06-12T18:{:02}:{:02}.{:09}Z'.format(i // 60 % 60, i % 60, i) for i in range(count)]
+
+
+def main():
+    report('Repeated EventSub timestamps', {
+        'legacy datetime': bench(legacy_datetime, SAMPLE_TIMESTAMPS),
+        'datetime (uncached)': bench(uncached, SAMPLE_TIMESTAMPS),
+        'datetime': bench(datetime, SAMPLE_TIMESTAMPS),
+    }, baseline='legacy datetime')
+
+    unique = unique_timestamps()
+    report('Unique EventSub timestamps', {
+        'legacy datetime': bench(legacy_datetime, unique),
+        'datetime': bench(datetime, unique),
+    }, baseline='legacy datetime')
+
+
+if __name__ == '__main__':
+    main()
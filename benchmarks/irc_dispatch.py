@@ -0,0 +1,34 @@
+"""
+Compares building IRC events through the per-command builder table against
+the previous raw -> IRCRawMessage -> to_json() -> from_dispatch path.
+
+    python -m benchmarks.irc_dispatch
+"""
+from benchmarks import SAMPLE_LINES, bench, report
+from benchmarks.irc_parser import legacy_from_raw
+from twitch.irc.builders import BUILDERS
+from twitch.irc.events import IRCChatEvent
+from twitch.types.irc import IRCRawMessage
+
+# The legacy path cannot handle USERNOTICE, and PING is not dispatched at all
+LINES = [line for line in SAMPLE_LINES if ' USERNOTICE ' not in line and not line.startswith('PING')]
+
+
+def legacy_dispatch(line):
+    return IRCChatEvent.from_dispatch(None, legacy_from_raw(line).to_json())
+
+
+def builder_dispatch(line):
+    event = IRCRawMessage.from_raw(line)
+    return BUILDERS[event.command](None, event)
+
+
+def main():
+    report('IRC raw line to event object', {
+        'legacy to_json path': bench(legacy_dispatch, LINES),
+        'builder table': bench(builder_dispatch, LINES),
+    }, baseline='legacy to_json path')
+
+
+if __name__ == '__main__':
+    main()
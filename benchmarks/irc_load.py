@@ -0,0 +1,81 @@
+"""
+Load tests the full socket -> parse -> emit -> handler path against a local
+`FakeIRCServer`, reporting how many chat events per second make it through.
+
+    python -m benchmarks.irc_load [--rate 50000] [--channels 50] [--duration 10]
+
+Generating the traffic competes with the client for the same CPU, so for rates
+past what a single process can push run the server separately:
+
+    python -m benchmarks.irc_load --serve --port 6667 --rate 50000
+    python -m benchmarks.irc_load --url ws://127.0.0.1:6667
+"""
+from gevent import monkey
+
+# The websocket client does blocking socket IO, it has to be cooperative here
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+
+from twitch.client import Client, ClientConfig  # noqa: E402
+from twitch.irc.fake import FakeIRCServer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=int, default=50000)
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--serve', action='store_true', help='only run the fake server')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--url', help='connect to an already running fake server')
+    args = parser.parse_args()
+
+    server = None
+    if not args.url:
+        server = FakeIRCServer(port=args.port, rate=args.rate, channels=args.channels)
+        if args.serve:
+            server.serve_forever()
+            return
+        server.start()
+
+    config = ClientConfig()
+    config.irc_url = args.url or server.url
+    config.irc_join_rate = (2000, 10)
+    client = Client(config)
+    client.irc._token = 'fake'
+    client.irc._nick = 'loadtest'
+
+    received = {'events': 0}
+
+    def on_event(event):
+        received['events'] += 1
+
+    for name in ('ChatMessageReceive', 'ChatUserNotice', 'ChatCleared'):
+        client.events.on(name, on_event)
+
+    client.irc.run()
+    client.irc.join(['loadtest{}'.format(index) for index in range(args.channels)])
+    gevent.sleep(1)
+
+    start_events, start_sent = received['events'], server.sent if server else 0
+    start = time.perf_counter()
+    gevent.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+
+    events = received['events'] - start_events
+    print('IRC load test ({} channels, {:.0f}s)'.format(args.channels, elapsed))
+    if server:
+        print('  {:<24} {:>12,.0f} lines/sec'.format('sent by server', (server.sent - start_sent) / elapsed))
+    print('  {:<24} {:>12,.0f} events/sec'.format('handled by client', events / elapsed))
+
+    client.irc.shutdown()
+    if server:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares the single-pass IRC line parser against the previous split based
+implementation of `IRCRawMessage.from_raw`.
+
+    python -m benchmarks.irc_parser
+"""
+import copy
+
+from benchmarks import SAMPLE_LINES, bench, report
+from twitch.irc.parser import parse
+from twitch.types.irc import IRCRawMessage
+
+
+def legacy_from_raw(message):
+    # The original split/pop implementation, kept verbatim for comparison
+    if not message:
+        return None
+
+    parts = message.split(' ')
+
+    prefix = None
+    tags = {}
+    parameters = []
+
+    if parts[0].startswith('@'):
+        tags_str = parts.pop(0)[1:]
+        tags_list = tags_str.split(';')
+        tags = {tag.split('=')[0]: tag.split('=')[1] for tag in tags_list}
+
+    if parts[0].startswith(':'):
+        prefix = parts.pop(0)[1:]
+
+    command = parts.pop(0)
+
+    while parts:
+        if parts[0].startswith(':'):
+            parameters.append(' '.join(parts)[1:].rstrip('\r\n'))
+            break
+        parameters.append(parts.pop(0).rstrip('\r\n'))
+    return IRCRawMessage(prefix=prefix, tags=tags, command=command, parameters=parameters, raw=copy.copy(message))
+
+
+def read_tags(from_raw):
+    # What a typical ChatMessageReceive listener ends up touching
+    def _f(line):
+        tags = from_raw(line).tags
+        return tags.get('id'), tags.get('user-id'), tags.get('mod')
+    return _f
+
+
+def main():
+    report('IRC line parsing', {
+        'legacy from_raw': bench(legacy_from_raw, SAMPLE_LINES),
+        'parse': bench(parse, SAMPLE_LINES),
+        'IRCRawMessage.from_raw': bench(IRCRawMessage.from_raw, SAMPLE_LINES),
+    }, baseline='legacy from_raw')
+
+    report('IRC line parsing + reading three tags', {
+        'legacy from_raw': bench(read_tags(legacy_from_raw), SAMPLE_LINES),
+        'IRCRawMessage.from_raw': bench(read_tags(IRCRawMessage.from_raw), SAMPLE_LINES),
+    }, baseline='legacy from_raw')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Replays an IRC capture (see `twitch.irc.capture`) through `IRCClient.handle_frame`
+and reports throughput, per-line latency and allocations. Without a capture
+file a synthetic one is built from the sample lines.
+
+    python -m benchmarks.irc_replay [capture.gz] [--speed N] [--allocations]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks import SAMPLE_LINES
+from twitch.client import Client, ClientConfig
+from twitch.irc.capture import CAPTURE_HEADER, Replay
+from twitch.irc.client import IRCClient
+
+
+def synthetic_capture(path, frames=20000, lines_per_frame=3):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{} 0\n'.format(CAPTURE_HEADER))
+        for frame in range(frames):
+            for index in range(lines_per_frame):
+                line = SAMPLE_LINES[(frame * lines_per_frame + index) % len(SAMPLE_LINES)]
+                f.write('{}\t{}\n'.format(frame, line))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('capture', nargs='?')
+    parser.add_argument('--speed', type=float, default=None)
+    parser.add_argument('--allocations', action='store_true')
+    args = parser.parse_args()
+
+    path = args.capture
+    if not path:
+        fd, path = tempfile.mkstemp(suffix='.cap')
+        os.close(fd)
+        synthetic_capture(path)
+
+    try:
+        irc = IRCClient(Client(ClientConfig()))
+        result = Replay(irc, path, speed=args.speed, trace_allocations=args.allocations).run()
+    finally:
+        if not args.capture:
+            os.remove(path)
+
+    print('IRC replay of {lines:,} lines in {frames:,} frames ({elapsed:.2f}s)'.format(**result))
+    print('  {:<24} {:>12,.0f} lines/sec'.format('handle_frame', result['lines_per_sec']))
+    for key, value in result['line_latency_us'].items():
+        if key.startswith('p') or key in ('min', 'max'):
+            print('  {:<24} {:>12,.1f} us'.format('line ' + key, value))
+
+    if args.allocations:
+        print('  {:<24} {:>12,} bytes'.format('allocated', result['allocated_bytes']))
+        print('  {:<24} {:>12,} bytes'.format('peak', result['peak_bytes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares the compiled `Model.to_dict`/`Model.dumps` serializers against the
+previous generic `to_dict` loop, on EventSub events shaped like the ones we
+re-publish.
+
+    python -m benchmarks.model_dump
+"""
+import json
+
+from datetime import datetime as real_datetime
+
+from benchmarks import bench, report
+from twitch.eventsub.registry import get_event_class
+from twitch.types.base import Field, ListField, Model
+
+SAMPLE_EVENTS = [
+    ('channel.follow', {
+        'user_id': '1234', 'user_login': 'cool_user', 'user_name': 'Cool_User',
+        'broadcaster_user_id': '1337', 'broadcaster_user_login': 'cooler_user',
+        'broadcaster_user_name': 'Cooler_User', 'followed_at': '2020-07-15T18:16:11.17106713Z',
+    }),
+    ('channel.subscribe', {
+        'user_id': '1234', 'user_login': 'cool_user', 'user_name': 'Cool_User',
+        'broadcaster_user_id': '1337', 'broadcaster_user_login': 'cooler_user',
+        'broadcaster_user_name': 'Cooler_User', 'tier': '1000', 'is_gift': False,
+    }),
+    ('channel.poll.progress', {
+        'id': '1243456', 'broadcaster_user_id': '1337', 'broadcaster_user_login': 'cool_user',
+        'broadcaster_user_name': 'Cool_User', 'title': 'Aren’t shoes just really hard socks?',
+        'choices': [
+            {'id': '123', 'title': 'Yeah!', 'bits_votes': 5, 'channel_points_votes': 7, 'votes': 12},
+            {'id': '124', 'title': 'No!', 'bits_votes': 10, 'channel_points_votes': 4, 'votes': 14},
+        ],
+        'bits_voting': {'is_enabled': True, 'amount_per_vote': 10},
+        'channel_points_voting': {'is_enabled': True, 'amount_per_vote': 10},
+        'started_at': '2020-07-15T17:16:03.17106713Z', 'ends_at': '2020-07-15T17:16:08.17106713Z',
+    }),
+]
+
+
+def legacy_to_dict(self, ignore=None):
+    # The original generic loop, kept verbatim for comparison
+    obj = {}
+    for name, field in self.__class__._fields.items():
+        if ignore and name in ignore:
+            continue
+
+        if field.metadata.get('private'):
+            continue
+
+        if getattr(self, name) is None:
+            continue
+        obj[name] = legacy_serialize(getattr(self, name), field)
+    return obj
+
+
+def legacy_serialize(value, inst=None):
+    # `Field.serialize`, recursing into `legacy_to_dict` rather than the compiled path
+    if inst is not None and type(inst).serialize is not Field.serialize:
+        if isinstance(inst, ListField):
+            return list(map(legacy_serialize, value))
+        return inst.serialize(value, inst)
+
+    if isinstance(value, real_datetime):
+        return value.isoformat()
+    elif isinstance(value, Model):
+        return legacy_to_dict(value, ignore=(inst.ignore_dump if inst else []))
+    else:
+        if inst and inst.cast:
+            return inst.cast(value)
+        return value
+
+
+def legacy_dumps(self):
+    return json.dumps(legacy_to_dict(self))
+
+
+def build_events():
+    return [get_event_class(name).create(dict(data), None) for name, data in SAMPLE_EVENTS]
+
+
+def main():
+    events = build_events()
+
+    report('EventSub event to_dict', {
+        'legacy to_dict': bench(legacy_to_dict, events),
+        'to_dict': bench(Model.to_dict, events),
+    }, baseline='legacy to_dict')
+
+    report('EventSub event to JSON', {
+        'legacy to_dict + json': bench(legacy_dumps, events),
+        'dumps': bench(Model.dumps, events),
+    }, baseline='legacy to_dict + json')
+
+
+if __name__ == '__main__':
+    main()
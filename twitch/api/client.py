@@ -179,5 +179,15 @@ class APIClient(LoggingClass):
         print(r.json())
         return r.json()
 
+    def eventsub_delete_subscription(self, access_token, subscription_id, client_id=None):
+        r = self.http(Routes.DELETE_EVENTSUB_SUBSCRIPTION,
+                      headers={
+                          'Authorization': f'Bearer {access_token}',
+                          'Client-Id': f'{client_id or self.client.config.client_id}'
+                      },
+                      params={'id': subscription_id})
+
+        return r.status_code == 204
+
     def channels_commercial_start(self, broadcaster, length, auth=None):
         pass
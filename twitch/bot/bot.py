@@ -1,6 +1,8 @@
 from twitch.bot.command import CommandLevels, CommandEvent
 from twitch.bot.plugin import find_loadable_plugins
 from twitch.bot.storage import Storage
+from twitch.eventsub.webhook import WebhookReceiver
+from twitch.types.chat import ChatBadges
 from twitch.util.config import Config
 from twitch.util.enum import get_enum_value_by_name
 from twitch.util.logging import LoggingClass
@@ -18,6 +20,23 @@ import importlib
 
 from gevent.pywsgi import WSGIServer
 
+# Badge masks checked (in order) for the default command level of a user
+BADGE_LEVELS = (
+    (ChatBadges.BROADCASTER, CommandLevels.BROADCASTER),
+    (ChatBadges.MODERATOR, CommandLevels.MOD),
+    (ChatBadges.VIP, CommandLevels.VIP),
+    (ChatBadges.ARTIST, CommandLevels.ARTIST),
+    (ChatBadges.SUBSCRIBER | ChatBadges.FOUNDER, CommandLevels.SUBSCRIBER),
+)
+
+# Boolean `ChatUser` flags standing in for badges, for users built without a `badges` tag
+BADGE_ATTRIBUTES = (
+    ('broadcaster', ChatBadges.BROADCASTER),
+    ('mod', ChatBadges.MODERATOR),
+    ('vip', ChatBadges.VIP),
+    ('subscriber', ChatBadges.SUBSCRIBER),
+)
+
 
 class BotConfig(Config):
     """
@@ -71,6 +90,12 @@ class BotConfig(Config):
         The host string for the HTTP Flask server (if enabled).
     http_port : int
         The port for the HTTP Flask server (if enabled).
+    eventsub_webhook_secret : str
+        If set (and the HTTP server is enabled), EventSub webhook deliveries signed
+        with this secret are received and dispatched like websocket events.
+    eventsub_webhook_path : str
+        The route EventSub webhook deliveries are received on, the subscriptions'
+        callback URL should point here.
     """
     deprecated = {'commands_prefix': 'command_prefixes'}
 
@@ -101,6 +126,9 @@ class BotConfig(Config):
     http_host = '0.0.0.0'
     http_port = 7575
 
+    eventsub_webhook_secret = None
+    eventsub_webhook_path = '/eventsub'
+
 
 class Bot(LoggingClass):
 
@@ -130,6 +158,15 @@ class Bot(LoggingClass):
             self.http = Flask('twitch')
             self.http_server = WSGIServer((self.config.http_host, self.config.http_port), self.http,
                                           log=self.log if self.config.http_logging else None)
+
+        # Receive EventSub over webhooks on the HTTP server if we have a secret to verify them with
+        self.webhook = None
+        if self.http and self.config.eventsub_webhook_secret:
+            self.webhook = WebhookReceiver(self.client, self.config.eventsub_webhook_secret)
+            self.http.add_url_rule(self.config.eventsub_webhook_path, view_func=self.webhook.view(), methods=['POST'])
+
+        # Only start serving once the webhook route exists, so early deliveries don't 404
+        if self.http:
             self.http_server_greenlet = gevent.spawn(self.http_server.serve_forever)
 
         self.plugins = {}
@@ -331,11 +368,17 @@ class Bot(LoggingClass):
             if actor.id in self.config.levels:
                 level = self.config.levels[actor.id]
             else:
-                # TODO: Add emoji artist, and maybe move this over to a "default level getter" method instead?
+                # TODO: Maybe move this over to a "default level getter" method instead?
                 #   So this way levels aren't forced by default?
-                for _type in ["broadcaster", "mod", "vip", "subscriber"]:
-                    if getattr(actor, _type):
-                        level = getattr(CommandLevels, _type.upper())
+                flags = actor.badge_flags.value if actor.badge_flags else 0
+                if not flags:
+                    for attr, mask in BADGE_ATTRIBUTES:
+                        if getattr(actor, attr, None):
+                            flags |= mask
+
+                for mask, badge_level in BADGE_LEVELS:
+                    if flags & mask:
+                        level = badge_level
                         break
 
         return level
@@ -344,11 +387,7 @@ class Bot(LoggingClass):
         if not command.level:
             return True
 
-        level = self.get_level(event.user)
-
-        if level >= command.level:
-            return True
-        return False
+        return self.get_level(event.user) >= command.level
 
     # TODO: Update TO TWITCH
     def handle_command_event(self, event, content=None):
@@ -485,6 +524,16 @@ class Bot(LoggingClass):
         """
         self.client.run_forever()
 
+    def shutdown(self):
+        """
+        Stops the HTTP server and webhook receiver, then shuts the client down.
+        """
+        if self.webhook:
+            self.webhook.shutdown()
+        if self.http:
+            self.http_server.stop()
+        self.client.shutdown()
+
     def add_plugin_module(self, path, config=None):
         """
         Adds and loads a plugin, based on its module path.
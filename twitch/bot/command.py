@@ -5,6 +5,7 @@ except ImportError:
 import argparse
 
 from twitch.bot.parser import ArgumentSet, ArgumentError
+from twitch.irc.outbound import SendPriority
 from twitch.util.functional import simple_cached_property
 
 ARGS_REGEX = '(?: ((?:\n|.)*)$|$)'
@@ -83,10 +84,11 @@ class CommandEvent:
         A convenient method to call the respective events' reply methods.
         """
         # @reply-parent-msg-id=885196de-cb67-427a-baa8-82f9b0fcd05f PRIVMSG #lovingt3s :absolutely!
-        self.client.irc.send(f"@reply-parent-msg-id={self._event.id} PRIVMSG #{self._event.channel} :{content}")
+        self.client.irc.send_message(self._event.channel, content, reply_to=self._event.id,
+                                     priority=SendPriority.HIGH)
 
-    def send_message(self, content):
-        self.client.irc.send(f"PRIVMSG #{self._event.channel} :{content}")
+    def send_message(self, content, priority=SendPriority.LOW):
+        self.client.irc.send_message(self._event.channel, content, priority=priority)
 
 
 
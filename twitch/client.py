@@ -1,9 +1,14 @@
 import gevent
 import gevent.event
 
+from twitch.irc.capture import CaptureRecorder
 from twitch.irc.client import IRCClient
+from twitch.irc.pool import IRCPool
+from twitch.irc.presence import PresenceIndex
+from twitch.irc.state import ChannelStateStore
 from twitch.api.client import APIClient
 from twitch.eventsub.client import EventSubClient
+from twitch.eventsub.pool import EventSubPool
 from twitch.util.config import Config
 from twitch.util.emitter import Emitter
 from twitch.util.logging import LoggingClass
@@ -23,6 +28,75 @@ class ClientConfig(Config):
         The redirect URI the internal server should reference for any awaiting user access tokens.
     log_level : str
         The logging level to use.
+    irc_url : str
+        The IRC websocket to connect to, only worth changing to point at a local
+        stand-in (see `twitch.irc.fake.FakeIRCServer`).
+    irc_ping_interval : int
+        How often (in seconds) to PING the IRC server to measure the round trip
+        time, 0 disables it.
+    irc_liveness_timeout : int
+        How long (in seconds) an IRC connection may go without receiving anything
+        before it's considered dead and reconnected. Checked whether or not PINGs
+        are enabled, 0 disables it.
+    irc_pool_enabled : bool
+        Whether to spread joined channels over a pool of IRC connections instead
+        of a single one.
+    irc_channels_per_connection : int
+        The maximum amount of channels joined on a single pooled IRC connection.
+    irc_join_rate : tuple(int, int)
+        The amount of JOINs allowed per amount of seconds (20 per 10 seconds for
+        regular accounts, 2000 per 10 seconds for verified bots).
+    irc_message_rate : tuple(int, int)
+        The amount of chat messages allowed per amount of seconds, across every
+        channel (20 per 30 seconds, or 100 per 30 seconds when moderating).
+    irc_channel_message_rate : tuple(int, int)
+        The amount of chat messages allowed per amount of seconds in a single channel.
+    irc_max_channel_queue : int
+        The maximum amount of queued outbound messages per channel and priority,
+        anything past this is dropped.
+    irc_duplicate_policy : str
+        What to do with a message identical to the previous one in its channel
+        (which Twitch would reject within 30 seconds), either 'drop' it or 'hold'
+        it until it can be sent.
+    irc_ratelimit_backoff : tuple(int, int)
+        The initial and maximum amount of seconds all sends are paused for after
+        Twitch reports we hit the chat rate limit.
+    irc_membership_opt_out : list(str)
+        Channels whose chatters aren't tracked, their JOIN/PART lines are dropped
+        as soon as they're received.
+    reconnect_backoff : tuple(int, int)
+        The initial and maximum amount of seconds to wait between reconnect
+        attempts. The wait doubles with every failed attempt, and is randomized
+        so many clients don't reconnect at the same moment.
+    eventsub_pool_enabled : bool
+        Whether to spread EventSub subscriptions over several websocket sessions
+        (see `EventSubPool.subscribe`) instead of a single one.
+    eventsub_max_sessions : int
+        The maximum amount of pooled EventSub sessions.
+    eventsub_subscriptions_per_session : int
+        The maximum amount of subscriptions placed on a single pooled EventSub session.
+    eventsub_dedup_size : int
+        Roughly how many EventSub message ids are remembered to drop redeliveries.
+    eventsub_dedup_age : int
+        Roughly how long (in seconds) EventSub message ids are remembered for.
+    eventsub_dedup_across_reconnects : bool
+        Whether remembered EventSub message ids are kept when reconnecting.
+    ingest_queue_size : int
+        The maximum amount of received websocket messages (IRC frames, EventSub
+        messages) waiting to be dispatched, per connection (or per pool, for pooled
+        IRC connections).
+    ingest_workers : int
+        The amount of greenlets dispatching received messages per connection.
+        Anything above 1 gives up on messages being handled in order.
+    ingest_policy : str
+        What to do when the ingest queue is full: 'block' reading, 'drop_oldest'
+        queued message, or 'drop_type' to drop messages of the `ingest_drop_types`.
+    ingest_drop_types : list(str)
+        The IRC commands (e.g. 'PRIVMSG', 'JOIN') and EventSub subscription types
+        which may be dropped under the 'drop_type' policy.
+    irc_capture_path : str
+        If set, every raw IRC line received is recorded to this file (gzipped
+        if it ends in `.gz`), for replaying with `twitch.irc.capture.Replay`.
     """
 
     app_token = ''
@@ -32,6 +106,34 @@ class ClientConfig(Config):
     log_level = 'info'
     log_unknown_events = False
 
+    irc_url = "wss://irc-ws.chat.twitch.tv"
+    irc_ping_interval = 30
+    irc_liveness_timeout = 90
+    irc_pool_enabled = False
+    irc_channels_per_connection = 100
+    irc_join_rate = (20, 10)
+    irc_message_rate = (20, 30)
+    irc_channel_message_rate = (1, 1)
+    irc_max_channel_queue = 100
+    irc_duplicate_policy = 'drop'
+    irc_ratelimit_backoff = (5, 120)
+    irc_membership_opt_out = []
+    irc_capture_path = None
+
+    reconnect_backoff = (1, 120)
+
+    eventsub_pool_enabled = False
+    eventsub_max_sessions = 3
+    eventsub_subscriptions_per_session = 300
+    eventsub_dedup_size = 200000
+    eventsub_dedup_age = 600
+    eventsub_dedup_across_reconnects = True
+
+    ingest_queue_size = 10000
+    ingest_workers = 1
+    ingest_policy = 'block'
+    ingest_drop_types = []
+
 
 class Client(LoggingClass):
     """
@@ -57,6 +159,10 @@ class Client(LoggingClass):
         The API client.
     es : `EventSubClient`
         The EventSub client.
+    state : `ChannelStateStore`
+        The room settings and our own user state for every joined channel.
+    presence : `PresenceIndex`
+        The chatters currently in every joined channel.
     """
 
     def __init__(self, config):
@@ -64,13 +170,19 @@ class Client(LoggingClass):
         self.config = config
 
         self.events = Emitter()
+        self.state = ChannelStateStore(self)
+        self.presence = PresenceIndex(self)
 
         # TODO: IRC CLIENT
         # self.irc = IRCClient(self.config)
         self.api = APIClient()
         # TODO: API CLIENT
-        self.irc = IRCClient(self)
-        self.es = EventSubClient(self)
+        self.irc = IRCPool(self) if self.config.irc_pool_enabled else IRCClient(self)
+        self.es = EventSubPool(self) if self.config.eventsub_pool_enabled else EventSubClient(self)
+
+        self.capture = None
+        if self.config.irc_capture_path:
+            self.capture = CaptureRecorder(self, self.config.irc_capture_path).start()
 
         # TODO: Make methods to dynamically start a flask server or not :)
         self.running = gevent.event.Event()
@@ -81,6 +193,8 @@ class Client(LoggingClass):
         # TODO: Make shutdown methods for each mod
         self.es.shutdown()
         self.irc.shutdown()
+        if self.capture:
+            self.capture.stop()
         self.running.set()
 
     def start(self):
@@ -6,8 +6,11 @@ import gevent
 
 from websocket import WebSocketTimeoutException, WebSocketConnectionClosedException
 
-from twitch.eventsub.events import EventSubEvent
-from twitch.util.leakybucket import LeakyBucket, LeakyBucketException
+from twitch.eventsub.registry import get_event_class, get_event_name
+from twitch.util.backoff import Backoff
+from twitch.util.emitter import Priority
+from twitch.util.ingest import IngestQueue
+from twitch.util.dedup import DedupWindow
 from twitch.util.logging import LoggingClass
 from twitch.util.websocket import Websocket
 
@@ -23,7 +26,9 @@ class EventSubClient(LoggingClass):
 
         # TODO: CONFIG
         self.max_reconnects = 25
-        self.remember_past_events = 15
+        self.dedup_size = client.config.get('eventsub_dedup_size', 200000)
+        self.dedup_age = client.config.get('eventsub_dedup_age', 600)
+        self.dedup_across_reconnects = client.config.get('eventsub_dedup_across_reconnects', True)
         # TODO: CONFIG END
 
         self._events = client.events
@@ -34,18 +39,51 @@ class EventSubClient(LoggingClass):
         self.session_id = None
         self.shutting_down = False
         self.reconnects = 0
+        self.backoff = Backoff(*client.config.get('reconnect_backoff', (1, 120)))
+
+        # Total seconds spent disconnected (between a close and the next open)
+        self.downtime = 0
+        self.last_downtime = 0
 
         self._client = client
-        self._gateway_url = "wss://eventsub.wss.twitch.tv/ws" if not gateway_url else gateway_url
+        self._default_gateway_url = "wss://eventsub.wss.twitch.tv/ws" if not gateway_url else gateway_url
+        self._gateway_url = self._default_gateway_url
         self._keepalive_timeout_seconds = None
         self._heartbeat_task = None
         self._last_event_sent = None
         self._ws_status = "STARTING"
-        self._last_events = LeakyBucket(self.remember_past_events)
+        self.dedup = DedupWindow(self.dedup_size, self.dedup_age)
+        self._opened = False
+        self._disconnected_at = None
+
+        self.ingest = IngestQueue(
+            self.handle_message,
+            size=client.config.get('ingest_queue_size', 10000),
+            workers=client.config.get('ingest_workers', 1),
+            policy=client.config.get('ingest_policy', 'block'),
+            drop_types=client.config.get('ingest_drop_types', []),
+            name='EventSub',
+        )
+
+    @property
+    def connection_metrics(self):
+        return {
+            'connected': self._ws_status == "CONNECTED",
+            'reconnects': self.reconnects,
+            'failed_attempts': self.backoff.failures,
+            'downtime': self.downtime + (time.time() - self._disconnected_at if self._disconnected_at else 0),
+            'last_downtime': self.last_downtime,
+        }
 
     def on_open(self):
         self._ws_status = "OPENED"
         self.log.info('WS Opened')
+        self._opened = True
+
+        if self._disconnected_at is not None:
+            self.last_downtime = time.time() - self._disconnected_at
+            self.downtime += self.last_downtime
+            self._disconnected_at = None
 
     def on_close(self, code=None, reason=None):
         self._events.emit("WEBSOCKET_CLOSED")
@@ -61,16 +99,11 @@ class EventSubClient(LoggingClass):
             self.log.info('WS Closed: shutting down')
             return
 
-        if self._ws_status != "RECONNECT_REQUEST":
-            self.reconnects += 1
-            self._last_events.clean()
-            self.log.info('WS Closed:{}{} ({})'.format(' [{}]'.format(code) if code else '', ' {}'.format(reason) if reason else '', self.reconnects))
-
-            if self.max_reconnects and self.reconnects > self.max_reconnects:
-                raise Exception('Failed to reconnect after {} attempts, giving up'.format(self.max_reconnects))
+        if self._disconnected_at is None:
+            self._disconnected_at = time.time()
 
-        # TODO handle logic on non resumes/reconnects
-        self.connect_and_run()
+        # Reconnecting is left to the loop in `connect_and_run`
+        self.log.info('WS Closed:{}{}'.format(' [{}]'.format(code) if code else '', ' {}'.format(reason) if reason else ''))
 
     def on_error(self, error):
         if self.shutting_down:
@@ -85,7 +118,61 @@ class EventSubClient(LoggingClass):
         if not isinstance(error, WebSocketConnectionClosedException):
             raise Exception('WS received error: {}'.format(error))
 
+    @staticmethod
+    def _peek(msg, key):
+        # Reads a string value out of the raw JSON without decoding all of it
+        start = msg.find('"{}"'.format(key))
+        if start == -1:
+            return None
+        start = msg.find('"', msg.find(':', start + len(key) + 2)) + 1
+        return msg[start:msg.find('"', start)] if start else None
+
     def on_message(self, msg):
+        # Runs in the websocket reader. Any message proves the connection is alive, and
+        #  session messages are handled right away so they are never queued behind (or
+        #  dropped in favour of) notifications
+        self._last_event_sent = time.time()
+
+        # Only peek inside the metadata, an event could carry the same keys in its payload
+        payload = msg.find('"payload"')
+        if not -1 < msg.find('"metadata"') < payload:
+            return self.ingest.put(msg, None)
+        metadata = msg[:payload]
+
+        message_type = self._peek(metadata, 'message_type')
+        if message_type and message_type.startswith('session_'):
+            return self.handle_message(msg)
+
+        subscription_type = self._peek(metadata, 'subscription_type')
+        if message_type == 'notification' and \
+                not self.wants(subscription_type, self._peek(metadata, 'subscription_version')):
+            return
+
+        self.ingest.put(msg, subscription_type or message_type)
+
+    def wants(self, subscription_type, version=None):
+        """
+        Whether anything listens for the given subscription type, unknown types
+        are let through so they're reported when dispatched.
+        """
+        name = get_event_name(subscription_type, version)
+        return name is None or self._client.events.has_listeners(name)
+
+    def handle_message(self, msg):
+        # Notifications are dispatched straight from their metadata, the event
+        #  itself is only decoded if a handler touches it
+        if -1 < msg.find('"metadata"') < msg.find('"payload"') and self._peek(msg, 'message_type') == 'notification':
+            cls = get_event_class(self._peek(msg, 'subscription_type'), self._peek(msg, 'subscription_version'))
+            _mid = self._peek(msg, 'message_id')
+            if cls and _mid:
+                if not self.dedup.add(_mid):
+                    self.log.warning(f"Duplicate websocket message: {_mid}")
+                    return
+
+                self.log.debug('EventSubClient.handle_dispatch %s', cls.__name__)
+                self._client.events.emit(cls.__name__, cls.from_raw(self._client, msg))
+                return
+
         try:
             data = json.loads(msg)
         except JSONDecodeError:
@@ -99,13 +186,10 @@ class EventSubClient(LoggingClass):
             self.log.warning(f"Websocket message does not contain required metadata:\n{data}")
             return
 
-        try:
-            self._last_events.add(_mid, throw=True)
-        except LeakyBucketException:
+        if not self.dedup.add(_mid):
             self.log.warning(f"Duplicate websocket message: {_mid}")
             return
 
-        self._last_event_sent = time.time()
         if "session_" in _type:
             method = getattr(self, f"on_tw_{_type.split('session_')[1]}", None)
             if not method:
@@ -113,7 +197,13 @@ class EventSubClient(LoggingClass):
             else:
                 method(data.get('payload', {}))
         else:
-            obj = EventSubEvent.from_dispatch(self._client, data)
+            metadata = data['metadata']
+            cls = get_event_class(metadata.get('subscription_type'), metadata.get('subscription_version'))
+            if not cls:
+                self.log.error(f"Websocket event not mapped:\n{data}")
+                return
+
+            obj = cls.create(data['payload']['event'], self._client)
             self.log.debug('EventSubClient.handle_dispatch %s', obj.__class__.__name__)
             self._client.events.emit(obj.__class__.__name__, obj)
 
@@ -124,6 +214,9 @@ class EventSubClient(LoggingClass):
         self._heartbeat_task = gevent.spawn(self.heartbeat_task)
         self._ws_status = "CONNECTED"
         self._events.emit("WEBSOCKET_READY")
+        self.emit_welcome(data)
+
+    def emit_welcome(self, data):
         self._client.events.emit("session_welcome", data)
 
     def on_tw_keepalive(self, data):
@@ -151,19 +244,58 @@ class EventSubClient(LoggingClass):
             gevent.sleep(5)
 
     def shutdown(self):
+        self.ingest.shutdown()
         if self.ws:
             self.log.warning("Graceful shutdown initiated")
             self.shutting_down = True
             self.ws.close()
 
     def connect_and_run(self):
-        self.log.info('Opening websocket connection to URL `%s`', self._gateway_url)
-        self.ws = Websocket(self._gateway_url)
-        self.ws.emitter.on('on_open', self.on_open)
-        self.ws.emitter.on('on_error', self.on_error)
-        self.ws.emitter.on('on_close', self.on_close)
-        self.ws.emitter.on('on_message', self.on_message)
-        self.ws.run_forever(sslopt={'cert_reqs': ssl.CERT_NONE})
+        """
+        Connects, and keeps reconnecting (with an exponential, jittered backoff
+        between failed attempts) until shut down.
+        """
+        while not self.shutting_down:
+            self._opened = False
+            self.log.info('Opening websocket connection to URL `%s`', self._gateway_url)
+            self.ws = Websocket(self._gateway_url)
+            self.ws.emitter.on('on_open', self.on_open)
+            self.ws.emitter.on('on_error', self.on_error)
+            self.ws.emitter.on('on_close', self.on_close, priority=Priority.BEFORE)
+            self.ws.emitter.on('on_message', self.on_message, priority=Priority.BEFORE)
+            self.ws.run_forever(sslopt={'cert_reqs': ssl.CERT_NONE})
+
+            if self.shutting_down:
+                break
+
+            if self._disconnected_at is None:
+                self._disconnected_at = time.time()
+
+            # Twitch asked us to move to a new URL, which is tried once right away
+            if self._ws_status == "RECONNECT_REQUEST":
+                self._ws_status = "RECONNECTING"
+                self.backoff.reset()
+                continue
+
+            # Reconnect URLs are single use, anything else starts over from the default
+            #  URL (a failed attempt at a reconnect URL included)
+            self._ws_status = "STARTING"
+            self._gateway_url = self._default_gateway_url
+
+            # A connection which opened resets the backoff, only consecutive failures count
+            if self._opened:
+                self.backoff.reset()
+
+            delay = self.backoff.fail()
+            if self.max_reconnects and self.backoff.failures > self.max_reconnects:
+                raise Exception('Failed to reconnect after {} attempts, giving up'.format(self.max_reconnects))
+
+            self.reconnects += 1
+            if not self.dedup_across_reconnects:
+                self.dedup.clear()
+            self.log.info('Reconnecting to EventSub in %.1fs (attempt %s)', delay, self.backoff.failures)
+            gevent.sleep(delay)
 
     def run(self):
+        self.ingest.start()
         self.greenlet = gevent.spawn(self.connect_and_run)
\ No newline at end of file
@@ -9,18 +9,28 @@ from twitch.types.charity import Charity, CharityDonationAmount
 from twitch.types.entitlement import DropEntitlementData
 from twitch.types.extension import Product
 from twitch.types.user import User
-from twitch.util.string import get_event_name_from_doc_string
+from twitch.eventsub.registry import EVENT_TYPES, get_event_key
 
-# Mapping of twitch event name to our event classes
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+# Mapping of (twitch subscription type, version) to our event classes
 EVENTS_MAP = {}
 
+# Mapping of our event class names to the subscription types they're built from
+_EVENT_KEYS = {}
+for _key, _name in EVENT_TYPES.items():
+    _EVENT_KEYS.setdefault(_name, []).append(_key)
+
 
 class EventSubEventMeta(ModelMeta):
     def __new__(mcs, name, parents, dct):
         obj = super(EventSubEventMeta, mcs).__new__(mcs, name, parents, dct)
 
-        if name != 'EventSubEvent':
-            EVENTS_MAP[get_event_name_from_doc_string(obj.__doc__)] = obj
+        for key in _EVENT_KEYS.get(name, ()):
+            EVENTS_MAP[key] = obj
 
         return obj
 
@@ -38,12 +48,37 @@ class EventSubEvent(with_metaclass(EventSubEventMeta, Model)):
         """
         Create a new GatewayEvent instance based on event data.
         """
-        cls = EVENTS_MAP.get(data['metadata']['subscription_type'])
+        cls = EventSubEvent.get_class(
+            data['metadata']['subscription_type'],
+            data['metadata'].get('subscription_version'),
+        )
         if not cls:
             raise Exception('Could not find cls for {} ({})'.format(data['metadata']['subscription_type'], data))
 
         return cls.create(data['payload']['event'], client)
 
+    @staticmethod
+    def get_class(subscription_type, version=None):
+        return EVENTS_MAP.get(get_event_key(subscription_type, version))
+
+    @classmethod
+    def from_raw(cls, client, raw):
+        """
+        Create an instance of this event which is only decoded and loaded once
+        one of its attributes is first accessed, from the raw JSON of either a
+        websocket message or a webhook payload.
+        """
+        obj = cls.__new__(cls)
+        obj.client = client
+        obj._raw = raw
+        return obj
+
+    def _materialize(self):
+        data = json.loads(self.__dict__.pop('_raw'))
+        data = data['payload'] if 'payload' in data else data
+        event = self.create(data['event'], self.client)
+        self.__dict__.update(event.__dict__)
+
     @classmethod
     def create(cls, obj, client):
         """
@@ -70,6 +105,11 @@ class EventSubEvent(with_metaclass(EventSubEventMeta, Model)):
         return obj
 
     def __getattr__(self, name):
+        # Lazily created events are loaded on first access
+        if '_raw' in object.__getattribute__(self, '__dict__'):
+            self._materialize()
+            return getattr(self, name)
+
         try:
             _proxy = object.__getattribute__(self, '_proxy')
         except AttributeError:
@@ -107,6 +147,8 @@ def wraps_model(model, alias=None):
         cls._fields[alias] = Field(model)
         cls._fields[alias].name = alias
         cls._wraps_model = (alias, model)
+        cls._loader = None
+        cls._dumper = None
         cls._proxy = alias
         return cls
 
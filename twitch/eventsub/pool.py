@@ -0,0 +1,260 @@
+import gevent
+
+from twitch.eventsub.client import EventSubClient
+from twitch.util.dedup import DedupWindow
+from twitch.util.logging import LoggingClass
+
+
+class Subscription:
+    """
+    An EventSub subscription requested through an :class:`EventSubPool`, and
+    the session it currently lives on.
+    """
+    __slots__ = ['type', 'version', 'condition', 'access_token', 'client_id', 'session', 'id', 'active']
+
+    def __init__(self, _type, version, condition, access_token, client_id=None):
+        self.type = _type
+        self.version = version
+        self.condition = condition
+        self.access_token = access_token
+        self.client_id = client_id
+        self.session = None
+        self.id = None
+        self.active = False
+
+    def __repr__(self):
+        return '<Subscription {} v{} {}>'.format(self.type, self.version, self.condition)
+
+
+class EventSubSession(EventSubClient):
+    """
+    A single websocket session owned by an :class:`EventSubPool`. Behaves like
+    a regular `EventSubClient`, but shares the pool's dedup window and tells
+    the pool when it becomes ready, or dies and takes its subscriptions with it.
+    """
+    def __init__(self, pool, session_index):
+        super(EventSubSession, self).__init__(pool._client)
+        self.pool = pool
+        self.session_index = session_index
+
+        # Events can be redelivered to any session, so they all dedup against the same window
+        self.dedup = pool.dedup
+
+        # Subscriptions assigned to this session
+        self.subscriptions = []
+
+    @property
+    def ready(self):
+        return self._ws_status == "CONNECTED"
+
+    def on_tw_welcome(self, data):
+        super(EventSubSession, self).on_tw_welcome(data)
+        self.pool.on_session_ready(self)
+
+    def emit_welcome(self, data):
+        # Listeners see the pool connect once, not every session behind it
+        self.pool.on_session_welcome(self, data)
+
+    def on_close(self, code=None, reason=None):
+        # Subscriptions move over to the new connection on a requested reconnect,
+        #  anything else ends the session (and disables its subscriptions)
+        if not self.shutting_down and self._ws_status != "RECONNECT_REQUEST":
+            self.pool.on_session_closed(self)
+        super(EventSubSession, self).on_close(code, reason)
+
+
+class EventSubPool(LoggingClass):
+    """
+    Spreads EventSub subscriptions over several websocket sessions, since
+    Twitch caps the amount of subscriptions a single session can hold. Every
+    session emits into the same `client.events`, and redelivered events are
+    dropped through one shared dedup window. `session_welcome` is emitted once
+    the pool has a session connected, rather than for every session.
+
+    Parameters
+    ----------
+    client : :class:`twitch.client.Client`
+        The client this pool belongs to.
+    max_sessions : int
+        The maximum amount of sessions to open (Twitch allows 3 per user token).
+    subscriptions_per_session : int
+        The maximum amount of subscriptions placed on a single session.
+
+    Attributes
+    ----------
+    sessions : list(:class:`EventSubSession`)
+        Every session this pool has opened.
+    subscriptions : list(:class:`Subscription`)
+        Every subscription requested through this pool.
+    """
+    def __init__(self, client, max_sessions=None, subscriptions_per_session=None):
+        super(EventSubPool, self).__init__()
+
+        self.max_sessions = max_sessions or client.config.get('eventsub_max_sessions', 3)
+        self.subscriptions_per_session = subscriptions_per_session or \
+            client.config.get('eventsub_subscriptions_per_session', 300)
+
+        self.sessions = []
+        self.subscriptions = []
+        self.shutting_down = False
+
+        self.dedup = DedupWindow(
+            client.config.get('eventsub_dedup_size', 200000),
+            client.config.get('eventsub_dedup_age', 600),
+        )
+
+        self._client = client
+
+        # Subscriptions no session had room for, placed as soon as one does
+        self._unplaced = []
+
+    def _pick_session(self, exclude=None):
+        candidates = [
+            session for session in self.sessions
+            if session is not exclude and len(session.subscriptions) < self.subscriptions_per_session
+        ]
+
+        if candidates:
+            # Prefer connected sessions, then the one with the most room left
+            return min(candidates, key=lambda session: (not session.ready, len(session.subscriptions)))
+
+        if len(self.sessions) < self.max_sessions:
+            return self.add_session()
+
+        return None
+
+    def add_session(self):
+        session = EventSubSession(self, len(self.sessions))
+        self.sessions.append(session)
+        self.log.info('Opening EventSub session %s', session.session_index)
+        session.run()
+        return session
+
+    def subscribe(self, _type, version, condition, access_token, client_id=None):
+        """
+        Subscribes to an event, placing it on the session with the most room
+        left (opening new sessions as required). The subscription is created
+        once that session is connected.
+        """
+        subscription = Subscription(_type, version, condition, access_token, client_id)
+        self.subscriptions.append(subscription)
+        self._place(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        if subscription in self._unplaced:
+            self._unplaced.remove(subscription)
+        if subscription.session:
+            subscription.session.subscriptions.remove(subscription)
+            subscription.session = None
+        subscription.active = False
+
+        if subscription.id:
+            gevent.spawn(self._delete, subscription)
+
+    def _delete(self, subscription):
+        try:
+            deleted = self._client.api.eventsub_delete_subscription(
+                subscription.access_token,
+                subscription.id,
+                client_id=subscription.client_id,
+            )
+        except Exception:
+            self.log.exception('Failed to delete EventSub subscription %s: ', subscription)
+            return
+
+        if deleted:
+            subscription.id = None
+        else:
+            self.log.warning('Failed to delete EventSub subscription %s', subscription)
+
+    def _place(self, subscription, exclude=None, retry=False):
+        session = self._pick_session(exclude=exclude)
+        if not session:
+            if not retry:
+                self.log.warning('Every EventSub session is full, %s will wait for room', subscription)
+            self._unplaced.append(subscription)
+            return
+
+        subscription.session = session
+        subscription.active = False
+        session.subscriptions.append(subscription)
+
+        if session.ready:
+            gevent.spawn(self._create, subscription)
+
+    def _create(self, subscription):
+        session = subscription.session
+        if not session or not session.ready or subscription.active:
+            return
+
+        try:
+            result = self._client.api.eventsub_create_subscription(
+                subscription.access_token,
+                subscription.type,
+                subscription.version,
+                subscription.condition,
+                method='websocket',
+                session_id=session.session_id,
+                client_id=subscription.client_id,
+            )
+        except Exception:
+            self.log.exception('Failed to create EventSub subscription %s: ', subscription)
+            return
+
+        data = (result or {}).get('data')
+        if data:
+            subscription.id = data[0].get('id')
+            subscription.active = True
+        else:
+            self.log.warning('Failed to create EventSub subscription %s: %s', subscription, result)
+
+    def on_session_ready(self, session):
+        """
+        Creates every subscription placed on a session which just connected,
+        and places any which were waiting for room.
+        """
+        for subscription in session.subscriptions:
+            if not subscription.active:
+                gevent.spawn(self._create, subscription)
+
+        unplaced, self._unplaced = self._unplaced, []
+        for subscription in unplaced:
+            self._place(subscription, retry=True)
+
+    def on_session_welcome(self, session, data):
+        """
+        Emits `session_welcome` when the first of the pool's sessions connects
+        (again), the others joining it are only logged.
+        """
+        if any(other.ready for other in self.sessions if other is not session):
+            self.log.info('EventSub session %s connected', session.session_index)
+            return
+
+        self._client.events.emit("session_welcome", data)
+
+    def on_session_closed(self, session):
+        """
+        Moves every subscription of a dead session onto the others. Twitch
+        disables them along with the session, so they have to be created again.
+        """
+        moved, session.subscriptions = session.subscriptions, []
+        if not moved:
+            return
+
+        self.log.warning('EventSub session %s closed, moving %s subscriptions', session.session_index, len(moved))
+        for subscription in moved:
+            subscription.session = None
+            subscription.active = False
+            self._place(subscription, exclude=session)
+
+    def shutdown(self):
+        self.shutting_down = True
+        for session in self.sessions:
+            session.shutdown()
+
+    def run(self):
+        if not self.sessions:
+            self.add_session()
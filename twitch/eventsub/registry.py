@@ -0,0 +1,100 @@
+"""
+The EventSub subscription types (and versions) we have event classes for,
+declared by class name so they can be resolved without importing (or
+building) every event class in `twitch.eventsub.events`.
+"""
+
+# Mapping of (twitch subscription type, version) to the name of our event class
+EVENT_TYPES = {
+    ('session_welcome', '1'): 'SessionWelcome',
+    ('channel.ban', '1'): 'ChannelBan',
+    ('channel.subscribe', '1'): 'ChannelSubscribe',
+    ('channel.cheer', '1'): 'ChannelCheer',
+    ('channel.update', '2'): 'ChannelUpdate',
+    ('channel.unban', '1'): 'ChannelUnban',
+    ('channel.follow', '2'): 'ChannelFollow',
+    ('channel.raid', '1'): 'ChannelRaid',
+    ('channel.moderator.add', '1'): 'ChannelModeratorAdd',
+    ('channel.moderator.remove', '1'): 'ChannelModeratorRemove',
+    ('channel.guest_star_session.begin', 'beta'): 'ChannelGuestStarSessionBegin',
+    ('channel.guest_star_session.end', 'beta'): 'ChannelGuestStarSessionEnd',
+    ('channel.guest_star_session.update', 'beta'): 'ChannelGuestStarGuestUpdate',
+    ('channel.guest_star_settings.update', 'beta'): 'ChannelGuestStarSettingsUpdate',
+    ('channel.poll.begin', '1'): 'ChannelPollBegin',
+    ('channel.poll.progress', '1'): 'ChannelPollUpdate',
+    ('channel.poll.end', '1'): 'ChannelPollEnd',
+    ('channel.channel_points_custom_reward.add', '1'): 'ChannelPointsCustomRewardAdd',
+    ('channel.channel_points_custom_reward.update', '1'): 'ChannelPointsCustomRewardUpdate',
+    ('channel.channel_points_custom_reward.remove', '1'): 'ChannelPointsCustomRewardRemove',
+    ('channel.channel_points_custom_reward_redemption.add', '1'): 'ChannelPointsCustomRewardRedemptionAdd',
+    ('channel.channel_points_custom_reward_redemption.update', '1'): 'ChannelPointsCustomRewardRedemptionUpdate',
+    ('channel.prediction.begin', '1'): 'ChannelPredictionBegin',
+    ('channel.prediction.progress', '1'): 'ChannelPredictionProgress',
+    ('channel.prediction.lock', '1'): 'ChannelPredictionLock',
+    ('channel.prediction.end', '1'): 'ChannelPredictionEnd',
+    ('channel.subscription', '1'): 'ChannelSubscription',
+    ('channel.subscription.end', '1'): 'ChannelSubscriptionEnd',
+    ('channel.subscription.gift', '1'): 'ChannelSubscriptionGift',
+    ('channel.subscription.message', '1'): 'ChannelSubscriptionMessage',
+    ('channel.charity_campaign.donate', '1'): 'CharityDonation',
+    ('channel.charity_campaign.start', '1'): 'CharityCampaignStart',
+    ('channel.charity_campaign.progress', '1'): 'CharityCampaignProgress',
+    ('channel.charity_campaign.stop', '1'): 'CharityCampaignStop',
+    ('drop.entitlement.grant', '1'): 'DropEntitlementGrant',
+    ('extension.bits_transaction.create', '1'): 'ExtensionBitsTransactionCreate',
+    ('channel.goal.begin', '1'): 'GoalBegin',
+    ('channel.goal.progress', '1'): 'GoalProgress',
+    ('channel.goal.end', '1'): 'GoalEnd',
+    ('channel.hype_train.begin', '1'): 'HypeTrainBegin',
+    ('channel.hype_train.progress', '1'): 'HypeTrainProgress',
+    ('channel.hype_train.end', '1'): 'HypeTrainEnds',
+    ('stream.online', '1'): 'StreamOnline',
+    ('stream.offline', '1'): 'StreamOffline',
+    ('user.authorization.grant', '1'): 'UserAuthorizationGrant',
+    ('user.authorization.revoke', '1'): 'UserAuthorizationRevoke',
+    ('user.update', '1'): 'UserUpdate',
+    ('channel.shield_mode.begin', '1'): 'ShieldModeBegin',
+    ('channel.shield_mode.end', '1'): 'ShieldModeEnd',
+    ('channel.shoutout.create', '1'): 'ShoutOutCreate',
+    ('channel.shoutout.receive', '1'): 'ShoutOutReceived',
+}
+
+# The newest version of every subscription type, for lookups without a version
+LATEST_VERSIONS = {}
+for _type, _version in EVENT_TYPES:
+    LATEST_VERSIONS[_type] = _version
+
+
+def get_event_key(subscription_type, version=None):
+    """
+    Returns the (subscription type, version) key we have an event class
+    registered under, or None if we have none for the type. Without a
+    version the newest one is used, as is the case for a version we don't know.
+    """
+    if (subscription_type, version) in EVENT_TYPES:
+        return subscription_type, version
+
+    version = LATEST_VERSIONS.get(subscription_type)
+    return (subscription_type, version) if version else None
+
+
+def get_event_name(subscription_type, version=None):
+    """
+    Returns the name of the event class (and so the event emitted) for the
+    given subscription type and version, or None if we have no class for it.
+    """
+    key = get_event_key(subscription_type, version)
+    return EVENT_TYPES[key] if key else None
+
+
+def get_event_class(subscription_type, version=None):
+    """
+    Returns the event class for the given subscription type and version,
+    importing `twitch.eventsub.events` the first time it's needed.
+    """
+    name = get_event_name(subscription_type, version)
+    if name is None:
+        return None
+
+    from twitch.eventsub import events
+    return getattr(events, name)
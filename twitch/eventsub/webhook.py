@@ -0,0 +1,149 @@
+import hashlib
+import hmac
+import time
+
+from twitch.eventsub.registry import get_event_class
+from twitch.types.base import parse_rfc3339
+from twitch.util.ingest import IngestQueue
+from twitch.util.logging import LoggingClass
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+# Twitch's headers for webhook deliveries
+MESSAGE_ID = 'Twitch-Eventsub-Message-Id'
+MESSAGE_TIMESTAMP = 'Twitch-Eventsub-Message-Timestamp'
+MESSAGE_SIGNATURE = 'Twitch-Eventsub-Message-Signature'
+MESSAGE_TYPE = 'Twitch-Eventsub-Message-Type'
+SUBSCRIPTION_TYPE = 'Twitch-Eventsub-Subscription-Type'
+SUBSCRIPTION_VERSION = 'Twitch-Eventsub-Subscription-Version'
+
+# Deliveries older than this are refused, as Twitch recommends, so captured requests can't be replayed
+MAX_MESSAGE_AGE = 10 * 60
+
+
+class WebhookReceiver(LoggingClass):
+    """
+    The receiving side of the EventSub webhook transport. Verifies the
+    signature of every delivery, answers the challenge Twitch sends when a
+    subscription is created, and acknowledges notifications right away,
+    leaving building and dispatching the events to an ingest queue.
+
+    Notifications go through the same dedup window as the websocket
+    transport (`client.es.dedup`), so an event delivered over both, or
+    redelivered to another node, is only dispatched once.
+
+    Parameters
+    ----------
+    client : :class:`twitch.client.Client`
+        The client events are emitted through.
+    secret : str
+        The secret the subscriptions were created with.
+    """
+    def __init__(self, client, secret):
+        super(WebhookReceiver, self).__init__()
+        self.client = client
+        self.secret = secret.encode('utf-8')
+        self.dedup = client.es.dedup
+
+        self.ingest = IngestQueue(
+            self.dispatch,
+            size=client.config.get('ingest_queue_size', 10000),
+            workers=client.config.get('ingest_workers', 1),
+            policy=client.config.get('ingest_policy', 'block'),
+            drop_types=client.config.get('ingest_drop_types', []),
+            name='EventSub webhook',
+        ).start()
+
+    def verify(self, headers, body):
+        message_id = headers.get(MESSAGE_ID)
+        timestamp = headers.get(MESSAGE_TIMESTAMP)
+        signature = headers.get(MESSAGE_SIGNATURE)
+        if not message_id or not timestamp or not signature:
+            return False
+
+        expected = 'sha256=' + hmac.new(
+            self.secret,
+            message_id.encode('utf-8') + timestamp.encode('utf-8') + body,
+            hashlib.sha256,
+        ).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            return False
+
+        try:
+            sent = parse_rfc3339(timestamp).timestamp()
+        except ValueError:
+            return False
+
+        return abs(time.time() - sent) <= MAX_MESSAGE_AGE
+
+    def handle(self, headers, body):
+        """
+        Handles a single webhook delivery.
+
+        :param headers: Mapping of the request headers (case insensitive).
+        :param body: bytes of the raw request body.
+        :return: tuple(status code, response body, content type)
+        """
+        if not self.verify(headers, body):
+            self.log.warning('Refusing EventSub webhook delivery with a bad or stale signature')
+            return 403, '', 'text/plain'
+
+        message_type = headers.get(MESSAGE_TYPE)
+
+        if message_type == 'notification':
+            # Notifications are acknowledged without decoding the body, which is only
+            #  done if a handler ends up touching the event
+            cls = get_event_class(headers.get(SUBSCRIPTION_TYPE), headers.get(SUBSCRIPTION_VERSION))
+            if not cls:
+                self.log.warning('Unknown EventSub webhook subscription type: %s', headers.get(SUBSCRIPTION_TYPE))
+                return 204, '', 'text/plain'
+
+            if not self.client.events.has_listeners(cls.__name__):
+                return 204, '', 'text/plain'
+
+            if not self.dedup.add(headers.get(MESSAGE_ID)):
+                self.log.debug('Duplicate EventSub webhook delivery: %s', headers.get(MESSAGE_ID))
+                return 204, '', 'text/plain'
+
+            self.ingest.put((cls, body), headers.get(SUBSCRIPTION_TYPE))
+            return 204, '', 'text/plain'
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            self.log.warning('Refusing EventSub webhook delivery with a malformed body')
+            return 400, '', 'text/plain'
+
+        if message_type == 'webhook_callback_verification':
+            self.log.info('Verified EventSub webhook for %s', data['subscription']['type'])
+            return 200, data['challenge'], 'text/plain'
+
+        if message_type == 'revocation':
+            self.log.warning('EventSub webhook subscription %s revoked (%s)',
+                             data['subscription']['type'], data['subscription'].get('status'))
+            self.client.events.emit('EVENTSUB_REVOCATION', data['subscription'])
+
+        return 204, '', 'text/plain'
+
+    def dispatch(self, item):
+        cls, body = item
+        self.log.debug('WebhookReceiver.handle_dispatch %s', cls.__name__)
+        self.client.events.emit(cls.__name__, cls.from_raw(self.client, body))
+
+    def view(self):
+        """
+        A Flask view function for this receiver.
+        """
+        from flask import request, Response
+
+        def eventsub_webhook():
+            status, body, content_type = self.handle(request.headers, request.get_data())
+            return Response(body, status=status, content_type=content_type)
+
+        return eventsub_webhook
+
+    def shutdown(self):
+        self.ingest.shutdown()
@@ -0,0 +1,242 @@
+from twitch.irc.events import ChatReady, ChatMessageReceive, ChatNotice, ChatRoomUpdate, ChatUserNotice, \
+    ChatWhisper, ChatMessageDelete, ChatCleared, ChatRoomJoin, ChatRoomPart, ChatUserState
+from twitch.irc.emotes import EmoteMap
+from twitch.types.chat import ChatMessage, ChatUser, ChatBadge, ChatBadges, ChatBadgeValue, parse_badges, \
+    parse_subscriber_months, split_badges
+from twitch.util.hashmap import HashMap
+
+# Mapping of IRC command to a function which builds the final event object
+#  straight from a parsed line, skipping both `IRCRawMessage.to_json` and the
+#  generic `Model.load_into` path. Every builder must assign every field of the
+#  models it creates, since nothing fills in defaults for them. Tags are read
+#  through the lazy `IRCTags` view, so only the keys a builder needs get decoded.
+BUILDERS = {}
+
+
+def builds(*commands):
+    def deco(func):
+        for command in commands:
+            BUILDERS[command] = func
+        return func
+    return deco
+
+
+def _new(cls, client):
+    inst = cls.__new__(cls)
+    inst.client = client
+    return inst
+
+
+def _badge(client, name, value):
+    badge = _new(ChatBadge, client)
+    badge.name = name
+    badge.value = value
+    return badge
+
+
+def _int(value, default=None):
+    return int(value) if value else default
+
+
+def _flag(value):
+    return None if value is None else value == '1'
+
+
+def _nick(prefix):
+    return prefix[:prefix.find('!')] if prefix and '!' in prefix else prefix
+
+
+def _event(cls, client, line):
+    # Events keep the parsed line they were built from
+    event = _new(cls, client)
+    event.raw_data = line
+    return event
+
+
+@builds('GLOBALUSERSTATE')
+def build_chat_ready(client, line):
+    tags = line.tags
+    event = _event(ChatReady, client, line)
+    event.user_id = _int(tags.get('user-id'))
+    event.badge_info = tags.get('badge-info')
+    event.badges = tags.get('badges')
+    event.color = tags.get('color')
+    event.display_name = tags.get('display-name')
+    event.username = event.display_name.lower() if event.display_name else None
+    emote_sets = tags.get('emote-sets')
+    event.emote_sets = emote_sets.split(',') if emote_sets else []
+    event.user_type = tags.get('user-type')
+    return event
+
+
+@builds('PRIVMSG')
+def build_chat_message_receive(client, line):
+    tags = line.tags
+    channel = line.parameters[0][1:]
+    username = _nick(line.prefix)
+
+    user = _new(ChatUser, client)
+    user.id = _int(tags.get('user-id'))
+    user.username = username
+    user.display_name = tags.get('display-name')
+    badges = tags.get('badges')
+    user.badges = [_badge(client, name, value) for name, value in split_badges(badges)]
+    flags = parse_badges(badges)
+    if tags.get('mod') == '1':
+        flags |= ChatBadges.MODERATOR
+    if channel == username:
+        flags |= ChatBadges.BROADCASTER
+    user.badge_flags = ChatBadgeValue(flags)
+    user.subscriber_months = parse_subscriber_months(tags.get('badge-info'))
+    user.chat_color = tags.get('color')
+    user.mod = bool(flags & ChatBadges.MODERATOR)
+    user.returning_chatter = tags.get('returning-chatter') == '1'
+    user.subscriber = tags.get('subscriber') == '1'
+    user.turbo = tags.get('turbo') == '1'
+    user.user_type = tags.get('user-type')
+    user.vip = tags.get('vip') == '1' or bool(flags & ChatBadges.VIP)
+    user.broadcaster = bool(flags & ChatBadges.BROADCASTER)
+
+    message = _new(ChatMessage, client)
+    message.id = tags.get('id')
+    message.channel = channel
+    message.broadcaster_id = _int(tags.get('room-id'))
+    message.content = line.parameters[1] if len(line.parameters) > 1 else None
+    emotes = tags.get('emotes')
+    message.emojis = EmoteMap(emotes, message.content) if emotes else HashMap()
+    message.user = user
+    message.first_message = tags.get('first-msg') == '1'
+    message.emote_only = tags.get('emote-only') == '1'
+
+    event = _event(ChatMessageReceive, client, line)
+    event.chatmessage = message
+    return event
+
+
+@builds('NOTICE')
+def build_chat_notice(client, line):
+    event = _event(ChatNotice, client, line)
+    event.id = line.tags.get('msg-id')
+    event.channel = line.parameters[0][1:]
+    event.message = line.parameters[1] if len(line.parameters) > 1 else None
+    return event
+
+
+@builds('ROOMSTATE')
+def build_chat_room_update(client, line):
+    # After the initial ROOMSTATE on join Twitch only sends the tags which changed,
+    #  so anything missing is left as None rather than reset to its default.
+    tags = line.tags
+    event = _event(ChatRoomUpdate, client, line)
+    event.emote_only = _flag(tags.get('emote-only'))
+    event.followers_only = _int(tags.get('followers-only'))
+    event.unique_only = _flag(tags.get('r9k'))
+    event.channel = line.parameters[0][1:]
+    event.channel_id = _int(tags.get('room-id'), 0)
+    event.slowmode = _int(tags.get('slow'))
+    event.sub_only = _flag(tags.get('subs-only'))
+    return event
+
+
+@builds('USERSTATE')
+def build_chat_user_state(client, line):
+    tags = line.tags
+    event = _event(ChatUserState, client, line)
+    event.id = tags.get('id')
+    event.channel = line.parameters[0][1:]
+    event.badge_info = tags.get('badge-info')
+    event.badges = tags.get('badges')
+    event.color = tags.get('color')
+    event.display_name = tags.get('display-name')
+    emote_sets = tags.get('emote-sets')
+    event.emote_sets = emote_sets.split(',') if emote_sets else []
+    event.mod = tags.get('mod') == '1'
+    event.subscriber = tags.get('subscriber') == '1'
+    event.user_type = tags.get('user-type')
+    return event
+
+
+@builds('USERNOTICE')
+def build_chat_user_notice(client, line):
+    tags = line.tags
+    event = _event(ChatUserNotice, client, line)
+    event.id = tags.get('id')
+    event.msg_id = tags.get('msg-id')
+    event.system_msg = tags.get('system-msg')
+    event.tmi_timestamp = tags.get('tmi-sent-ts')
+    event.channel = line.parameters[0][1:]
+    event.channel_id = _int(tags.get('room-id'))
+    event.message = line.parameters[1] if len(line.parameters) > 1 else None
+    event.badge_info = tags.get('badge-info')
+    event.badges = tags.get('badges')
+    event.color = tags.get('color')
+    event.emotes = tags.get('emotes')
+    event.emojis = EmoteMap(event.emotes, event.message) if event.emotes else HashMap()
+    event.username = tags.get('login')
+    event.user_id = _int(tags.get('user-id'))
+    event.user_type = tags.get('user-type', 'normal')
+    event.display_name = tags.get('display-name')
+    event.mod = tags.get('mod') == '1'
+    event.subscriber = tags.get('subscriber') == '1'
+    event.turbo = tags.get('turbo') == '1'
+    return event
+
+
+@builds('WHISPER')
+def build_chat_whisper(client, line):
+    tags = line.tags
+    event = _event(ChatWhisper, client, line)
+    event.id = tags.get('message-id')
+    event.thread_id = tags.get('thread-id')
+    event.from_user = _nick(line.prefix)
+    event.to_user = line.parameters[0]
+    event.content = line.parameters[1] if len(line.parameters) > 1 else None
+    event.badges = tags.get('badges')
+    event.color = tags.get('color')
+    event.display_name = tags.get('display-name')
+    event.emotes = tags.get('emotes')
+    event.user_id = _int(tags.get('user-id'))
+    event.user_type = tags.get('user-type')
+    return event
+
+
+@builds('CLEARMSG')
+def build_chat_message_delete(client, line):
+    tags = line.tags
+    event = _event(ChatMessageDelete, client, line)
+    event.channel = line.parameters[0][1:]
+    event.channel_id = _int(tags.get('room-id'), 0)
+    event.message = line.parameters[1] if len(line.parameters) > 1 else None
+    event.message_id = tags.get('target-msg-id')
+    event.user = tags.get('login')
+    event.tmi_timestamp = tags.get('tmi-sent-ts')
+    return event
+
+
+@builds('CLEARCHAT')
+def build_chat_cleared(client, line):
+    tags = line.tags
+    event = _event(ChatCleared, client, line)
+    event.channel = line.parameters[0][1:]
+    event.channel_id = _int(tags.get('room-id'), 0)
+    event.user = line.parameters[1] if len(line.parameters) > 1 else None
+    event.user_id = _int(tags.get('target-user-id'))
+    event.ban_duration = _int(tags.get('ban-duration'))
+    event.tmi_timestamp = tags.get('tmi-sent-ts')
+    return event
+
+
+@builds('JOIN')
+def build_chat_room_join(client, line):
+    event = _event(ChatRoomJoin, client, line)
+    event.channel = line.parameters[0][1:]
+    event.user = _nick(line.prefix)
+    return event
+
+
+@builds('PART')
+def build_chat_room_part(client, line):
+    event = _event(ChatRoomPart, client, line)
+    event.channel = line.parameters[0][1:]
+    event.user = _nick(line.prefix)
+    return event
@@ -0,0 +1,193 @@
+import gzip
+import time
+import tracemalloc
+
+import gevent
+
+from twitch.util.emitter import Priority
+from twitch.util.logging import LoggingClass
+from twitch.util.metrics import Histogram
+
+CAPTURE_HEADER = '#twitch-irc-capture 1'
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='\n')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+
+def read_capture(path):
+    """
+    Reads a capture file, yielding (offset, line) pairs where offset is the
+    amount of seconds since the recording started.
+    """
+    with _open(path, 'r') as f:
+        header = f.readline().rstrip('\n')
+        if not header.startswith(CAPTURE_HEADER):
+            raise ValueError('{} is not an IRC capture file'.format(path))
+
+        for entry in f:
+            offset, _, line = entry.rstrip('\n').partition('\t')
+            yield int(offset) / 1000.0, line
+
+
+class CaptureRecorder(LoggingClass):
+    """
+    Records every raw line received over IRC (through `IRC_WS_RAW`, emitted
+    by the websocket reader before anything is queued or dropped) into a
+    capture file, which `Replay` can feed back into an `IRCClient` later.
+
+    Each line is stored as `<milliseconds since start>\\t<raw line>`, and the
+    file is gzipped when its name ends in `.gz`.
+
+    Parameters
+    ----------
+    client : :class:`twitch.client.Client`
+        The client whose IRC traffic is recorded.
+    path : str
+        Where to write the capture.
+    """
+    def __init__(self, client, path):
+        super(CaptureRecorder, self).__init__()
+        self.client = client
+        self.path = path
+        self.lines = 0
+
+        self._file = None
+        self._start = None
+        self._listener = None
+
+    def start(self):
+        self._file = _open(self.path, 'w')
+        self._file.write('{} {}\n'.format(CAPTURE_HEADER, int(time.time())))
+        self._start = time.monotonic()
+        self._listener = self.client.events.on('IRC_WS_RAW', self.on_raw, priority=Priority.BEFORE)
+        self.log.info('Recording IRC traffic to %s', self.path)
+        return self
+
+    def on_raw(self, line):
+        if not line:
+            return
+
+        self._file.write('{}\t{}\n'.format(int((time.monotonic() - self._start) * 1000), line))
+        self.lines += 1
+
+    def stop(self):
+        if self._listener:
+            self._listener.remove()
+            self._listener = None
+
+        if self._file:
+            self._file.close()
+            self._file = None
+            self.log.info('Recorded %s IRC lines to %s', self.lines, self.path)
+
+
+class _ReplaySocket:
+    # Stands in for the websocket, swallowing anything the client sends back (PONGs)
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, data):
+        self.sent += 1
+
+    def close(self):
+        pass
+
+
+class Replay(LoggingClass):
+    """
+    Feeds a capture back into `IRCClient.handle_frame`, without connecting to
+    Twitch, and measures how fast lines are parsed and dispatched.
+
+    Lines recorded at the same millisecond are paced as one frame, which is
+    how Twitch batches them, but every line is handled (and timed) on its own
+    so the latency reported is per line rather than per batch.
+
+    Parameters
+    ----------
+    irc : :class:`twitch.irc.client.IRCClient`
+        The client to feed. It is never connected.
+    path : str
+        The capture file to replay.
+    speed : float or None
+        1 replays at the recorded pace, 10 ten times as fast, and None (or 0)
+        as fast as possible.
+    trace_allocations : bool
+        Whether to track memory allocations while replaying, which is a lot
+        slower but reports how much was allocated along the way.
+    """
+    def __init__(self, irc, path, speed=None, trace_allocations=False):
+        super(Replay, self).__init__()
+        self.irc = irc
+        self.path = path
+        self.speed = speed
+        self.trace_allocations = trace_allocations
+
+    def frames(self):
+        frame, frame_offset = [], None
+        for offset, line in read_capture(self.path):
+            if frame and offset != frame_offset:
+                yield frame_offset, frame
+                frame = []
+            frame.append(line)
+            frame_offset = offset
+
+        if frame:
+            yield frame_offset, frame
+
+    def run(self):
+        """
+        Replays the whole capture, returning a dict with the amount of lines and
+        frames, the throughput, per-line latency percentiles (in microseconds)
+        and, if enabled, allocation stats.
+        """
+        irc = self.irc
+        irc.irc = _ReplaySocket()
+        if not irc._nick:
+            irc._nick = 'justinfan0'
+
+        latency = Histogram()
+        lines = frames = 0
+        busy = 0.0
+
+        if self.trace_allocations:
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        for offset, frame in self.frames():
+            if self.speed:
+                delay = offset / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    gevent.sleep(delay)
+
+            for line in frame:
+                began = time.perf_counter()
+                irc.handle_frame(line + '\r\n')
+                took = time.perf_counter() - began
+
+                busy += took
+                latency.add(took * 1e6)
+                lines += 1
+            frames += 1
+
+            # Let the spawned event handlers run, like they would between frames
+            gevent.sleep(0)
+
+        result = {
+            'lines': lines,
+            'frames': frames,
+            'elapsed': time.perf_counter() - start,
+            'lines_per_sec': lines / busy if busy else 0,
+            'line_latency_us': latency.summary(),
+        }
+
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['allocated_bytes'] = current - before
+            result['peak_bytes'] = peak
+
+        return result
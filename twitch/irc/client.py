@@ -1,24 +1,59 @@
 import ssl
+import time
 
 import gevent
 import gevent.event
 
-from twitch.irc.events import IRCChatEvent
+from twitch.irc.builders import BUILDERS
+from twitch.irc.outbound import SendQueue, SendPriority
+from twitch.irc.parser import peek_command
+from twitch.irc.presence import parse_membership
 from twitch.types.irc import IRCRawMessage
+from twitch.util.backoff import Backoff
+from twitch.util.emitter import Priority
+from twitch.util.ingest import IngestQueue
 from twitch.util.leakybucket import LeakyBucket
+from twitch.util.limiter import SimpleLimiter
 from twitch.util.logging import LoggingClass
+from twitch.util.metrics import Histogram
 from twitch.util.websocket import Websocket
 from websocket import WebSocketTimeoutException, WebSocketConnectionClosedException
 
+# IRC lines are capped at 512 bytes, including the trailing CRLF
+MAX_LINE_LENGTH = 510
+
+# NOTICEs Twitch answers a JOIN with when we can't be in the channel
+JOIN_REFUSED = frozenset(('msg_banned', 'msg_channel_suspended'))
+
+
+class JoinState:
+    # Waiting to be sent (or re-sent after a reconnect)
+    PENDING = 'pending'
+
+    # JOIN sent, waiting on the server to echo it back for our nick
+    JOINING = 'joining'
+
+    # Twitch confirmed we're in the channel
+    JOINED = 'joined'
+
 
 class IRCClient(LoggingClass):
-    def __init__(self, client):
+    """
+    A single IRC connection. The outbound queue, join limiter and ingest queue
+    are normally its own, but can be handed in to share them between several
+    connections (see :class:`twitch.irc.pool.IRCPool`), in which case whoever
+    created them is responsible for shutting them down.
+    """
+    def __init__(self, client, outbound=None, join_limiter=None, ingest=None):
         super(IRCClient, self).__init__()
 
         # TODO: CONFIG
         self.max_reconnects = 25
         self.remember_past_events = 15
         self.capabilities = ['membership', 'tags', 'commands']
+        self.join_rate = client.config.get('irc_join_rate', (20, 10))
+        self.ping_interval = client.config.get('irc_ping_interval', 30)
+        self.liveness_timeout = client.config.get('irc_liveness_timeout', 90)
         # TODO: CONFIG END
 
         self._events = client.events
@@ -28,39 +63,100 @@ class IRCClient(LoggingClass):
 
         self.shutting_down = False
         self.reconnects = 0
+        self.backoff = Backoff(*client.config.get('reconnect_backoff', (1, 120)))
+
+        # Total seconds spent disconnected (between a close and the next open)
+        self.downtime = 0
+        self.last_downtime = 0
+
+        # Round trip times (in seconds) of our own PINGs
+        self.rtt = Histogram(max_samples=100)
+        self.last_rtt = None
+
+        # Mapping of channel name to its `JoinState`
+        self.channels = {}
+        self.join_limiter = join_limiter or SimpleLimiter(*self.join_rate)
+        self.ready = gevent.event.Event()
+        self.outbound = outbound or SendQueue(client, self.send)
+        self.ingest = ingest or IngestQueue(
+            self.handle_frame,
+            size=client.config.get('ingest_queue_size', 10000),
+            workers=client.config.get('ingest_workers', 1),
+            policy=client.config.get('ingest_policy', 'block'),
+            drop_types=client.config.get('ingest_drop_types', []),
+            name='IRC',
+        )
+        self._owns_outbound = outbound is None
+        self._owns_ingest = ingest is None
 
         self._client = client
         self._token = None
         self._nick = None
-        self._irc_url = "wss://irc-ws.chat.twitch.tv"
+        self._irc_url = client.config.get('irc_url', "wss://irc-ws.chat.twitch.tv")
         # self._irc_status = "STARTING"
         self._last_events = LeakyBucket(self.remember_past_events)
 
+        # Insertion ordered sets of channels waiting on a JOIN/PART to go out
+        self._pending_joins = {}
+        self._pending_parts = {}
+        self._membership_changed = gevent.event.Event()
+        self._membership_task = None
+        self._opened = False
+        self._disconnected_at = None
+
+        self._ping_task = None
+        self._pings = {}
+        self._last_traffic = None
+
+    @property
+    def connection_metrics(self):
+        return {
+            'connected': self.ready.is_set(),
+            'reconnects': self.reconnects,
+            'failed_attempts': self.backoff.failures,
+            'downtime': self.downtime + (time.time() - self._disconnected_at if self._disconnected_at else 0),
+            'last_downtime': self.last_downtime,
+            'rtt': self.rtt.summary(),
+            'last_rtt': self.last_rtt,
+            'idle': time.monotonic() - self._last_traffic if self._last_traffic else None,
+        }
+
     def on_close(self, code=None, reason=None):
+        self.ready.clear()
+        if self._ping_task:
+            self._ping_task.kill()
+            self._ping_task = None
+        self._pings.clear()
         self._events.emit("CHAT_WS_CLOSED")
 
+        # Everything we were in (or joining) has to be joined again on the next connection
+        for channel, state in self.channels.items():
+            if state != JoinState.PENDING:
+                self.channels[channel] = JoinState.PENDING
+                self._pending_joins[channel] = None
+        self._pending_parts.clear()
+
         # If we're quitting, just break out of here
         if self.shutting_down:
             self.log.info('IRC WS Closed: shutting down')
             return
 
-        # TODO: Find another way given _irc_status can be removed
-        # if self._irc_status != "RECONNECT_REQUEST":
-        #     self.reconnects += 1
-        #     self._last_events.clean()
-        #     self.log.info('IRC WS Closed:{}{} ({})'.format(' [{}]'.format(code) if code else '',
-        #                                                    ' {}'.format(reason) if reason else '', self.reconnects))
-        #
-        #     if self.max_reconnects and self.reconnects > self.max_reconnects:
-        #         raise Exception('Failed to reconnect after {} attempts, giving up'.format(self.max_reconnects))
+        if self._disconnected_at is None:
+            self._disconnected_at = time.time()
 
-        # TODO handle logic on non resumes/reconnects
-        self.connect_and_run()
+        # Reconnecting is left to the loop in `connect_and_run`
+        self.log.info('IRC WS Closed:{}{}'.format(' [{}]'.format(code) if code else '', ' {}'.format(reason) if reason else ''))
 
     def on_open(self):
         # self._events.emit("CHAT_WS_OPEN")
         # self._irc_status = "OPENED"
         self.log.info('WS Opened')
+        self._opened = True
+
+        if self._disconnected_at is not None:
+            self.last_downtime = time.time() - self._disconnected_at
+            self.downtime += self.last_downtime
+            self._disconnected_at = None
 
         for x in self.capabilities:
             self.send(f"CAP REQ :twitch.tv/{x}")
@@ -69,6 +165,199 @@ class IRCClient(LoggingClass):
         self.send(f"NICK {self._nick}")
         # self._events.emit("CHAT_READY")
 
+        self.ready.set()
+        self._membership_changed.set()
+
+        self._last_traffic = time.monotonic()
+        if self.ping_interval or self.liveness_timeout:
+            self._ping_task = gevent.spawn(self._ping_loop)
+
+    def _ping_loop(self):
+        """
+        Sends our own PINGs (every `ping_interval`) to measure the round trip
+        time, and closes the connection (handing over to the reconnect loop)
+        once nothing has been received for longer than `liveness_timeout`,
+        which catches half-open sockets Twitch has long forgotten about. Either
+        can be turned off without the other.
+        """
+        # Liveness is checked a few times per timeout, even when we don't PING
+        tick = min(filter(None, (self.ping_interval, self.liveness_timeout / 3 if self.liveness_timeout else 0)))
+        last_ping = time.monotonic()
+
+        while True:
+            gevent.sleep(tick)
+
+            idle = time.monotonic() - self._last_traffic
+            if self.liveness_timeout and idle > self.liveness_timeout:
+                self.log.warning('Nothing received over IRC for %.0fs, forcing a reconnect', idle)
+                self._ping_task = None
+                self.irc.close()
+                return
+
+            if not self.ping_interval or time.monotonic() - last_ping < self.ping_interval:
+                continue
+
+            last_ping = time.monotonic()
+            token = str(time.monotonic_ns())
+            self._pings[token] = time.monotonic()
+            self.send(f"PING :{token}")
+
+            # Replies which never came shouldn't pile up
+            if len(self._pings) > 10:
+                self._pings.pop(next(iter(self._pings)))
+
+    def _on_pong(self, msg):
+        token = msg[msg.rfind(':') + 1:].rstrip()
+        sent = self._pings.pop(token, None)
+        if sent is None:
+            return
+
+        self.last_rtt = time.monotonic() - sent
+        self.rtt.add(self.last_rtt)
+        if self.last_rtt > 1:
+            self.log.warning('Slow IRC round trip: %.0fms', self.last_rtt * 1000)
+
+    def join(self, channels):
+        """
+        Joins one or more channels. Requests are coalesced into as few
+        `JOIN #a,#b,#c` lines as possible, and paced against the join rate limit.
+        """
+        if isinstance(channels, str):
+            channels = [channels]
+
+        for channel in channels:
+            channel = channel.lstrip('#').lower()
+            self._pending_parts.pop(channel, None)
+            if channel in self.channels:
+                continue
+
+            self.channels[channel] = JoinState.PENDING
+            self._pending_joins[channel] = None
+
+        self._membership_changed.set()
+
+    def part(self, channels):
+        """
+        Leaves one or more channels, coalescing the requests like `join`.
+        """
+        if isinstance(channels, str):
+            channels = [channels]
+
+        for channel in channels:
+            channel = channel.lstrip('#').lower()
+            self._pending_joins.pop(channel, None)
+            state = self.channels.pop(channel, None)
+            if state and state != JoinState.PENDING:
+                self._pending_parts[channel] = None
+
+        self._membership_changed.set()
+
+    def release_channels(self):
+        """
+        Forgets every channel without sending a PART, returning their names.
+        Used when the channels are being moved over to another connection.
+        """
+        channels = list(self.channels)
+        self.channels.clear()
+        self._pending_joins.clear()
+        self._pending_parts.clear()
+        return channels
+
+    def _take_line(self, command, pending, limiter=None):
+        # Always wait for room for at least one channel, then only grab what is free right
+        #  away. Nothing below yields, so `pending` can't change under us while we iterate.
+        if limiter:
+            limiter.check()
+
+        channels = []
+        length = len(command)
+
+        for channel in pending:
+            # One more `,#channel` (or ` #channel` for the first one)
+            length += len(channel) + 2
+            if length > MAX_LINE_LENGTH:
+                break
+
+            if limiter and channels and not limiter.check(blocking=False):
+                break
+
+            channels.append(channel)
+
+        for channel in channels:
+            del pending[channel]
+
+        return channels
+
+    def _send_membership(self, command, channels, pending):
+        # Channels are only taken off `pending` for good once their line made it out,
+        #  otherwise they'd be lost (the close handler skips PENDING channels)
+        try:
+            self.send('{} {}'.format(command, ','.join('#' + channel for channel in channels)))
+            return True
+        except WebSocketConnectionClosedException:
+            # Parts don't matter once disconnected, we're out of every channel by then
+            if command == 'JOIN':
+                self._requeue(channels, pending)
+            raise
+        except Exception:
+            self.log.exception('Failed to send %s for %s channels, retrying: ', command, len(channels))
+            self._requeue(channels, pending)
+            gevent.sleep(1)
+            return False
+
+    def _requeue(self, channels, pending):
+        for channel in channels:
+            # Skip anything parted (or joined again) in the meantime
+            state = self.channels.get(channel)
+            if state == JoinState.PENDING if pending is self._pending_joins else state is None:
+                pending[channel] = None
+
+    def _membership_loop(self):
+        while True:
+            self._membership_changed.wait()
+            self._membership_changed.clear()
+
+            try:
+                while self.ready.is_set() and (self._pending_joins or self._pending_parts):
+                    parts = self._take_line('PART', self._pending_parts)
+                    if parts:
+                        self._send_membership('PART', parts, self._pending_parts)
+                        continue
+
+                    joins = self._take_line('JOIN', self._pending_joins, self.join_limiter)
+                    if not joins or not self._send_membership('JOIN', joins, self._pending_joins):
+                        continue
+
+                    for channel in joins:
+                        if self.channels.get(channel) == JoinState.PENDING:
+                            self.channels[channel] = JoinState.JOINING
+            except WebSocketConnectionClosedException:
+                # Picked up again once reconnected
+                continue
+
+    def _on_membership(self, command, prefix, channel):
+        nick = prefix[:prefix.find('!')] if '!' in prefix else prefix
+        if not self._nick or nick != self._nick.lower():
+            return
+
+        if command == 'JOIN':
+            # Twitch follows our own JOIN with the full NAMES list
+            self._client.presence.reset(channel)
+            if channel in self.channels:
+                self.channels[channel] = JoinState.JOINED
+        else:
+            self._client.state.forget(channel)
+            self._client.presence.forget(channel)
+            self.outbound.forget(channel)
+            if self.channels.get(channel) == JoinState.JOINED:
+                # Removed from the channel by Twitch rather than by a part() call
+                self._lose_channel(channel)
+
+    def _lose_channel(self, channel):
+        # We're out of the channel without having asked to be, `join` may try it again later
+        self.channels.pop(channel, None)
+        self._pending_joins.pop(channel, None)
+
     def send(self, data):
         if data.startswith("PASS"):
             self.log.debug(f"Sending message: PASS *****************")
@@ -76,6 +365,12 @@ class IRCClient(LoggingClass):
             self.log.debug(f"Sending message: {data}")
         return self.irc.send(data)
 
+    def send_message(self, channel, content, reply_to=None, priority=SendPriority.LOW):
+        """
+        Queues a chat message, which is sent once the rate limits allow it.
+        """
+        return self.outbound.put(channel, content, reply_to=reply_to, priority=priority)
+
     def on_error(self, error):
         if self.shutting_down:
             return
@@ -89,38 +384,155 @@ class IRCClient(LoggingClass):
             raise Exception('WS received error: {}'.format(error))
 
     def shutdown(self):
+        if self._owns_outbound:
+            self.outbound.shutdown()
+        if self._owns_ingest:
+            self.ingest.shutdown()
+        if self._ping_task:
+            self._ping_task.kill()
+        if self._membership_task:
+            self._membership_task.kill()
+
         if self.irc:
             self.log.warning("Graceful shutdown initiated")
             self.shutting_down = True
             self.irc.close()
 
-    # TODO: Pool initial joins together, potentially squash entire ChannelJoin Object into one when bot joins.
-    def on_message(self, msg: IRCRawMessage):
+    def on_message(self, msg):
+        # Runs in the websocket reader, so only keepalives are handled right away and
+        #  everything else is left to the ingest queue's workers
+        self._last_traffic = time.monotonic()
+
+        # A frame can batch several lines, every one of them is looked at
+        drop_types = self.ingest.drop_types
+        emit_raw = self._events.has_listeners("IRC_WS_RAW")
+        lines = []
+        kind = None
+        reconnect = False
+        for line in msg.split("\r\n"):
+            if not line:
+                continue
+
+            # Raw lines are emitted as they're read, so captures see everything the
+            #  socket delivered (even lines handled here, or dropped by the queue) when it did
+            if emit_raw:
+                self._events.emit("IRC_WS_RAW", line)
+
+            if line.startswith("PING"):
+                self.send(f"PONG {line[5:].rstrip()}")
+                continue
+
+            if line.startswith(":tmi.twitch.tv PONG"):
+                self._on_pong(line)
+                continue
+
+            if line.startswith(":tmi.twitch.tv RECONNECT"):
+                reconnect = True
+                continue
+
+            lines.append(line)
+
+            # The frame is queued as its most important line, so droppable lines
+            #  can't take anything else in the frame down with them
+            command = peek_command(line)
+            if kind is None or (kind in drop_types and command not in drop_types):
+                kind = command
+
+        if lines:
+            self._enqueue("\r\n".join(lines), kind)
+
+        if reconnect:
+            # Twitch is about to restart the server, the supervisor loop connects again
+            self.log.info('Twitch requested an IRC reconnect')
+            self.irc.close()
+
+    def _enqueue(self, frame, kind):
+        self.ingest.put(frame, kind)
+
+    # TODO: Potentially squash entire ChannelJoin Object into one when bot joins.
+    def handle_frame(self, msg):
+        presence = self._client.presence
+        nick = self._nick.lower() if self._nick else None
+        batch = []
+
         for _msg in msg.split("\r\n"):
-            self._events.emit("IRC_WS_RAW", _msg)
+            # Other chatters' JOIN/PART lines make up most of the traffic in big channels,
+            #  so they're handled before (or instead of) the full parse
+            membership = parse_membership(_msg)
+            if membership and membership[1] != nick:
+                if not presence.tracking(membership[2]):
+                    continue
+
+                batch.append(membership)
+                if not self._events.has_listeners('ChatRoomJoin' if membership[0] == 'JOIN' else 'ChatRoomPart'):
+                    continue
+
             event = IRCRawMessage.from_raw(_msg)
             if not event:
-                return
+                continue
 
             if event.command == "PING":
                 self.send(f"PONG {event.parameters[0]}")
-            elif (event.command in
-                  ["PRIVMSG", "GLOBALUSERSTATE", "NOTICE", "ROOMSTATE", "USERNOTICE", "WHISPER", "CLEARMSG", "CLEARCHAT", "PART", "JOIN"]):
-                # self.log.debug(event.to_json())
-                obj = IRCChatEvent.from_dispatch(self._client, event.to_json())
-                self.log.debug('EventSubClient.handle_dispatch %s', obj.__class__.__name__)
-                self._events.emit(obj.__class__.__name__, obj)
-            else:
+                continue
+
+            if event.command == "JOIN" or event.command == "PART":
+                self._on_membership(event.command, event.prefix, event.parameters[0][1:])
+            elif event.command == "NOTICE" and event.tags.get('msg-id') in JOIN_REFUSED:
+                channel = event.parameters[0][1:]
+                if self.channels.get(channel) == JoinState.JOINING:
+                    self._lose_channel(channel)
+            elif event.command == "353":
+                # NAMES reply: <nick> = #<channel> :<login> <login> ...
+                presence.add_names(event.parameters[2][1:], event.parameters[3].split())
+                continue
+
+            builder = BUILDERS.get(event.command)
+            if not builder:
                 self.log.debug(f"Received unmapped event: {_msg}")
+                continue
+
+            obj = builder(self._client, event)
+            self.log.debug('IRCClient.handle_dispatch %s', obj.__class__.__name__)
+            self._events.emit(obj.__class__.__name__, obj)
+
+        if batch:
+            presence.apply(batch)
 
     def connect_and_run(self):
-        self.log.info('Opening irc connection to URL `%s`', self._irc_url)
-        self.irc = Websocket(self._irc_url)
-        self.irc.emitter.on('on_open', self.on_open)
-        self.irc.emitter.on('on_error', self.on_error)
-        self.irc.emitter.on('on_close', self.on_close)
-        self.irc.emitter.on('on_message', self.on_message)
-        self.irc.run_forever(sslopt={'cert_reqs': ssl.CERT_NONE})
+        """
+        Connects, and keeps reconnecting (with an exponential, jittered backoff
+        between failed attempts) until shut down.
+        """
+        while not self.shutting_down:
+            self._opened = False
+            self.log.info('Opening irc connection to URL `%s`', self._irc_url)
+            self.irc = Websocket(self._irc_url)
+            self.irc.emitter.on('on_open', self.on_open)
+            self.irc.emitter.on('on_error', self.on_error)
+            self.irc.emitter.on('on_close', self.on_close, priority=Priority.BEFORE)
+            self.irc.emitter.on('on_message', self.on_message, priority=Priority.BEFORE)
+            self.irc.run_forever(sslopt={'cert_reqs': ssl.CERT_NONE})
+
+            if self.shutting_down:
+                break
+
+            if self._disconnected_at is None:
+                self._disconnected_at = time.time()
+
+            # A connection which opened resets the backoff, only consecutive failures count
+            if self._opened:
+                self.backoff.reset()
+
+            delay = self.backoff.fail()
+            if self.max_reconnects and self.backoff.failures > self.max_reconnects:
+                raise Exception('Failed to reconnect after {} attempts, giving up'.format(self.max_reconnects))
+
+            self.reconnects += 1
+            self._last_events.clean()
+            self.log.info('Reconnecting to IRC in %.1fs (attempt %s)', delay, self.backoff.failures)
+            gevent.sleep(delay)
 
     def run(self):
+        self.ingest.start()
+        self._membership_task = gevent.spawn(self._membership_loop)
         self.greenlet = gevent.spawn(self.connect_and_run)
\ No newline at end of file
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from twitch.types.chat import ChatEmoji
+
+EMOTE_URL = 'https://static-cdn.jtvnw.net/emoticons/v2/{}/default/dark/1.0'
+
+# Mapping of emote id to its (shared) `ChatEmoji`, every message using an emote
+#  references the same object. The least recently used entries are evicted past
+#  `EMOTE_CACHE_SIZE`, so emotes in constant use stay put behind one-off ones.
+EMOTE_CACHE = OrderedDict()
+EMOTE_CACHE_SIZE = 10000
+
+
+def get_emote(emote_id, name):
+    emote = EMOTE_CACHE.get(emote_id)
+    if emote is not None:
+        EMOTE_CACHE.move_to_end(emote_id)
+        return emote
+
+    if len(EMOTE_CACHE) >= EMOTE_CACHE_SIZE:
+        EMOTE_CACHE.popitem(last=False)
+
+    emote = ChatEmoji.__new__(ChatEmoji)
+    emote.client = None
+    emote.id = emote_id
+    emote.name = name
+    emote.url = EMOTE_URL.format(emote_id)
+    EMOTE_CACHE[emote_id] = emote
+    return emote
+
+
+def parse_emotes(raw, content):
+    """
+    Decodes an `emotes` tag (`<id>:<start>-<end>,<start>-<end>/<id>:...`) into a
+    dict of emote name to :class:`twitch.types.chat.ChatEmoji`. Positions are
+    code point offsets into the message content, which is what Python indexes.
+    """
+    emotes = {}
+    if not raw or not content:
+        return emotes
+
+    for entry in raw.split('/'):
+        emote_id, _, ranges = entry.partition(':')
+        if not ranges:
+            continue
+
+        # Every range of an emote holds the same text, so the first is enough
+        start, _, end = ranges.partition(',')[0].partition('-')
+        try:
+            name = content[int(start):int(end) + 1]
+        except ValueError:
+            continue
+
+        if name:
+            emotes[name] = get_emote(emote_id, name)
+
+    return emotes
+
+
+class EmoteMap(Mapping):
+    """
+    A read-only mapping of emote name to :class:`twitch.types.chat.ChatEmoji`
+    for a single message, which only decodes the `emotes` tag the first time
+    it is accessed.
+    """
+    __slots__ = ('_raw', '_content', '_emotes')
+
+    def __init__(self, raw, content):
+        self._raw = raw
+        self._content = content
+        self._emotes = None
+
+    def _decode(self):
+        if self._emotes is None:
+            self._emotes = parse_emotes(self._raw, self._content)
+            self._raw = self._content = None
+        return self._emotes
+
+    def __getitem__(self, key):
+        return self._decode()[key]
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __len__(self):
+        return len(self._decode())
+
+    def __repr__(self):
+        if self._emotes is None:
+            return '<EmoteMap (not decoded)>'
+        return '<EmoteMap {}>'.format(self._emotes)
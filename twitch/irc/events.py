@@ -1,6 +1,6 @@
 # Mapping of twitch event name to our event classes
-from twitch.types.base import ModelMeta, Model, Field, SlottedModel, text, ListField, datetime
-from twitch.types.chat import ChatMessage
+from twitch.types.base import ModelMeta, Model, Field, SlottedModel, text, ListField, DictField, datetime
+from twitch.types.chat import ChatMessage, ChatEmoji
 from twitch.util.metaclass import with_metaclass
 
 EVENTS_MAP = {}
@@ -126,6 +126,7 @@ class ChatReady(IRCChatEvent):
     badges = Field(text)
     color = Field(text)
     display_name = Field(text)
+    username = Field(text)
     emote_sets = ListField(text)
     user_type = Field(text)
 
@@ -161,7 +162,7 @@ class ChatNotice(IRCChatEvent):
     message = Field(text)
 
 
-# TODO: Map after testing
+# Fields Twitch didn't include in the update (it only sends what changed) are None
 class ChatRoomUpdate(IRCChatEvent):
     emote_only = Field(bool, create=False)
     followers_only = Field(int, create=False)
@@ -174,7 +175,7 @@ class ChatRoomUpdate(IRCChatEvent):
 
 # TODO: Additional Notice types, like raid and sub D:
 class ChatUserNotice(IRCChatEvent):
-    id = Field(text),
+    id = Field(text)
     msg_id = Field(text, create=False)
     system_msg = Field(text, create=False)
     tmi_timestamp = Field(text, create=False)
@@ -185,6 +186,7 @@ class ChatUserNotice(IRCChatEvent):
     badges = Field(text, create=False)
     color = Field(text, create=False)
     emotes = Field(text, create=False)
+    emojis = DictField(text, ChatEmoji)
     username = Field(text)
     user_id = Field(int)
     user_type = Field(text, default="normal")
@@ -214,6 +216,7 @@ class ChatWhisper(IRCChatEvent):
     thread_id = Field(text)
     from_user = Field(text)
     to_user = Field(text)
+    content = Field(text)
     badges = Field(text, create=False)
     color = Field(text, create=False)
     display_name = Field(text, create=False)
@@ -222,5 +225,15 @@ class ChatWhisper(IRCChatEvent):
     user_type = Field(text, create=False)
 
 
+# Sent for our own user when joining a channel, and after every message we send to it
 class ChatUserState(IRCChatEvent):
-    pass
+    id = Field(text, create=False)
+    channel = Field(text)
+    badge_info = Field(text, create=False)
+    badges = Field(text, create=False)
+    color = Field(text, create=False)
+    display_name = Field(text, create=False)
+    emote_sets = ListField(text)
+    mod = Field(bool, create=False)
+    subscriber = Field(bool, create=False)
+    user_type = Field(text, create=False)
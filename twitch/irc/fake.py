@@ -0,0 +1,328 @@
+import base64
+import hashlib
+import itertools
+import random
+import struct
+import time
+
+import gevent
+import gevent.lock
+
+from gevent.server import StreamServer
+
+from twitch.util.logging import LoggingClass
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+PRIVMSG_TEMPLATE = (
+    '@badge-info=;badges={badges};color=#1E90FF;display-name={user};emotes=;first-msg=0;flags=;id={id};'
+    'mod=0;returning-chatter=0;room-id={room_id};subscriber=0;tmi-sent-ts={ts};turbo=0;user-id={user_id};'
+    'user-type= :{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #{channel} :{content}'
+)
+
+USERNOTICE_TEMPLATE = (
+    '@badge-info=subscriber/{months};badges=subscriber/0;color=;display-name={user};emotes=;id={id};login={user};'
+    'mod=0;msg-id=resub;msg-param-cumulative-months={months};msg-param-sub-plan=1000;room-id={room_id};'
+    'subscriber=1;system-msg={user}\\shas\\ssubscribed\\sfor\\s{months}\\smonths!;tmi-sent-ts={ts};turbo=0;'
+    'user-id={user_id};user-type= :tmi.twitch.tv USERNOTICE #{channel} :{content}'
+)
+
+CLEARCHAT_TEMPLATE = (
+    '@ban-duration=600;room-id={room_id};target-user-id={user_id};tmi-sent-ts={ts} '
+    ':tmi.twitch.tv CLEARCHAT #{channel} :{user}'
+)
+
+CONTENTS = [
+    'Kappa', 'hello chat', 'PogChamp that was close', 'what game is this?', 'LUL', 'gg',
+    'can you play the other map next', 'first time here, love the stream',
+]
+
+BADGES = ['', 'subscriber/12', 'premium/1', 'moderator/1', 'vip/1', 'subscriber/3,premium/1']
+
+
+def _frame(opcode, payload):
+    size = len(payload)
+    if size < 126:
+        header = struct.pack('!BB', 0x80 | opcode, size)
+    elif size < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, size)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, size)
+    return header + payload
+
+
+class FakeIRCConnection(LoggingClass):
+    """
+    A single client connected to a `FakeIRCServer`, speaking just enough of
+    the websocket protocol (RFC 6455) and Twitch IRC to fool an `IRCClient`.
+    """
+    def __init__(self, server, sock):
+        super(FakeIRCConnection, self).__init__()
+        self.server = server
+        self.sock = sock
+        self.nick = None
+        self.channels = []
+        self.received = 0
+
+        self._buffer = b''
+        self._lock = gevent.lock.Semaphore()
+        self._traffic = None
+
+    def _recv(self, size):
+        while len(self._buffer) < size:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise EOFError()
+            self._buffer += chunk
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _handshake(self):
+        while b'\r\n\r\n' not in self._buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise EOFError()
+            self._buffer += chunk
+
+        request, _, self._buffer = self._buffer.partition(b'\r\n\r\n')
+        key = None
+        for header in request.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = header.partition(':')
+            if name.strip().lower() == 'sec-websocket-key':
+                key = value.strip()
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.sock.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            'Sec-WebSocket-Accept: {}\r\n\r\n'
+        ).format(accept).encode())
+
+    def _read_frame(self):
+        first, second = self._recv(2)
+        opcode = first & 0x0F
+        size = second & 0x7F
+
+        if size == 126:
+            size, = struct.unpack('!H', self._recv(2))
+        elif size == 127:
+            size, = struct.unpack('!Q', self._recv(8))
+
+        mask = self._recv(4) if second & 0x80 else None
+        payload = self._recv(size)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        return opcode, payload
+
+    def _write(self, opcode, payload):
+        with self._lock:
+            self.sock.sendall(_frame(opcode, payload))
+
+    def send_lines(self, lines):
+        # Twitch packs several lines into a single frame, and so do we
+        self._write(OP_TEXT, ('\r\n'.join(lines) + '\r\n').encode('utf-8'))
+
+    def serve(self):
+        try:
+            self._handshake()
+            while True:
+                opcode, payload = self._read_frame()
+                if opcode == OP_CLOSE:
+                    self._write(OP_CLOSE, payload[:2])
+                    break
+                elif opcode == OP_PING:
+                    self._write(OP_PONG, payload)
+                elif opcode == OP_TEXT:
+                    for line in payload.decode('utf-8').split('\r\n'):
+                        if line:
+                            self.on_line(line)
+        except (EOFError, OSError):
+            pass
+        finally:
+            if self._traffic:
+                self._traffic.kill()
+            self.server.connections.remove(self)
+            self.sock.close()
+
+    def on_line(self, line):
+        self.received += 1
+        command, _, rest = line.partition(' ')
+
+        if command == 'CAP':
+            self.send_lines([':tmi.twitch.tv CAP * ACK :{}'.format(rest.partition(':')[2])])
+        elif command == 'NICK':
+            self.nick = rest.strip().lower()
+            self.send_lines([
+                ':tmi.twitch.tv 001 {} :Welcome, GLHF!'.format(self.nick),
+                ':tmi.twitch.tv 376 {} :>'.format(self.nick),
+                '@badge-info=;badges=;color=;display-name={0};emote-sets=0;user-id=1;user-type= '
+                ':tmi.twitch.tv GLOBALUSERSTATE'.format(self.nick),
+            ])
+            self._traffic = gevent.spawn(self._generate)
+        elif command == 'PING':
+            self.send_lines([':tmi.twitch.tv PONG tmi.twitch.tv {}'.format(rest)])
+        elif command == 'JOIN':
+            for channel in rest.split(','):
+                self.on_join(channel.strip().lstrip('#'))
+        elif command == 'PART':
+            for channel in rest.split(','):
+                channel = channel.strip().lstrip('#')
+                if channel in self.channels:
+                    self.channels.remove(channel)
+                self.send_lines([':{0}!{0}@{0}.tmi.twitch.tv PART #{1}'.format(self.nick, channel)])
+
+    def on_join(self, channel):
+        if channel not in self.channels:
+            self.channels.append(channel)
+
+        room_id = self.server.room_id(channel)
+        self.send_lines([
+            ':{0}!{0}@{0}.tmi.twitch.tv JOIN #{1}'.format(self.nick, channel),
+            ':{0}.tmi.twitch.tv 353 {0} = #{1} :{0}'.format(self.nick, channel),
+            ':{0}.tmi.twitch.tv 366 {0} #{1} :End of /NAMES list'.format(self.nick, channel),
+            '@badge-info=;badges=;color=;display-name={0};emote-sets=0;mod=0;subscriber=0;user-type= '
+            ':tmi.twitch.tv USERSTATE #{1}'.format(self.nick, channel),
+            '@emote-only=0;followers-only=-1;r9k=0;room-id={0};slow=0;subs-only=0 '
+            ':tmi.twitch.tv ROOMSTATE #{1}'.format(room_id, channel),
+        ])
+
+    def _generate(self):
+        server = self.server
+        interval = server.tick
+        owed = 0.0
+        last = time.perf_counter()
+
+        # Formatting lines costs more than parsing them, so cycle through a pre-built
+        #  corpus (rebuilt whenever the joined channels change) instead
+        corpus, corpus_channels, position = [], None, 0
+
+        while True:
+            gevent.sleep(interval)
+            now = time.perf_counter()
+            owed += (now - last) * server.rate
+            last = now
+
+            count = int(owed)
+            if not count or not self.channels:
+                continue
+            owed -= count
+
+            if corpus_channels != len(self.channels):
+                corpus_channels = len(self.channels)
+                corpus = [server.make_line(self.channels) for _ in range(server.corpus_size)]
+
+            lines = []
+            while len(lines) < count:
+                chunk = corpus[position:position + count - len(lines)]
+                position = (position + len(chunk)) % len(corpus)
+                lines.extend(chunk)
+
+            # Keep frames at a sane size, big bursts are split over several
+            for start in range(0, len(lines), server.max_lines_per_frame):
+                self.send_lines(lines[start:start + server.max_lines_per_frame])
+            server.sent += count
+
+
+class FakeIRCServer(LoggingClass):
+    """
+    A local stand-in for Twitch's IRC websocket, for load testing the whole
+    socket -> parse -> emit -> plugin path without connecting to Twitch.
+
+    Point a client at it through the `irc_url` config value. It acknowledges
+    CAP REQ/PASS/NICK, answers PINGs, confirms JOINs (and PARTs) the way Twitch
+    does, and then streams synthetic PRIVMSG, USERNOTICE and CLEARCHAT lines
+    into every channel a connection has joined.
+
+    Parameters
+    ----------
+    host : str
+        The address to listen on.
+    port : int
+        The port to listen on, 0 picks a free one (see `url`).
+    rate : int
+        The amount of synthetic lines per second sent to each connection.
+    channels : int
+        The amount of channels `channel_names` hands out for clients to join.
+    mix : tuple(float, float, float)
+        The share of PRIVMSG, USERNOTICE and CLEARCHAT lines in the traffic.
+    """
+    def __init__(self, host='127.0.0.1', port=0, rate=1000, channels=10, mix=(0.95, 0.04, 0.01)):
+        super(FakeIRCServer, self).__init__()
+        self.rate = rate
+        self.channels = channels
+        self.mix = mix
+
+        # TODO: CONFIG
+        self.tick = 0.01
+        self.max_lines_per_frame = 500
+        self.corpus_size = 20000
+        self.users = 5000
+        # TODO: CONFIG END
+
+        self.connections = []
+        self.sent = 0
+
+        self._server = StreamServer((host, port), self._handle)
+        self._ids = itertools.count()
+        self._random = random.Random(0)
+        self._room_ids = {}
+
+    @property
+    def url(self):
+        host, port = self._server.address[:2]
+        return 'ws://{}:{}'.format(host, port)
+
+    def channel_names(self):
+        return ['loadtest{}'.format(index) for index in range(self.channels)]
+
+    def room_id(self, channel):
+        room_id = self._room_ids.get(channel)
+        if room_id is None:
+            room_id = self._room_ids[channel] = 100000 + len(self._room_ids)
+        return room_id
+
+    def make_line(self, channels):
+        rand = self._random
+        channel = channels[rand.randrange(len(channels))]
+        user_id = rand.randrange(self.users)
+        values = {
+            'channel': channel,
+            'room_id': self.room_id(channel),
+            'user': 'viewer{}'.format(user_id),
+            'user_id': 200000 + user_id,
+            'id': '00000000-0000-0000-0000-{:012d}'.format(next(self._ids)),
+            'ts': int(time.time() * 1000),
+            'content': CONTENTS[rand.randrange(len(CONTENTS))],
+        }
+
+        roll = rand.random()
+        if roll < self.mix[0]:
+            return PRIVMSG_TEMPLATE.format(badges=BADGES[user_id % len(BADGES)], **values)
+        elif roll < self.mix[0] + self.mix[1]:
+            return USERNOTICE_TEMPLATE.format(months=1 + user_id % 48, **values)
+        return CLEARCHAT_TEMPLATE.format(**values)
+
+    def _handle(self, sock, address):
+        connection = FakeIRCConnection(self, sock)
+        self.connections.append(connection)
+        connection.serve()
+
+    def serve_forever(self):
+        self.log.info('Fake IRC server listening on %s', self.url)
+        self._server.serve_forever()
+
+    def start(self):
+        self._server.start()
+        self.log.info('Fake IRC server listening on %s', self.url)
+        return self
+
+    def stop(self):
+        self._server.stop()
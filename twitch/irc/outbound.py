@@ -0,0 +1,407 @@
+import time
+
+from collections import deque
+
+try:
+    import regex as re
+except ImportError:
+    import re
+
+import gevent
+import gevent.event
+
+from twitch.util.limiter import SimpleLimiter
+from twitch.util.logging import LoggingClass
+
+
+class SendPriority:
+    # Moderation actions and replies to users, always drained first
+    HIGH = 0
+
+    # Everything else (announcements, timers, bulk sends)
+    LOW = 1
+
+    ALL = (HIGH, LOW)
+
+
+# Twitch rejects a message identical to your previous one in a channel sent within this window
+DUPLICATE_WINDOW = 30
+
+# Per-channel pacing state is forgotten once a channel has had nothing queued or sent for this long
+IDLE_CHANNEL_TIMEOUT = 300
+
+NOTICE_SECONDS_RE = re.compile(r'(\d+) (?:more )?seconds?')
+
+
+class DuplicatePolicy:
+    # Discard the message when it is queued
+    DROP = 'drop'
+
+    # Keep it queued until the duplicate window has passed
+    HOLD = 'hold'
+
+
+class OutboundMessage:
+    __slots__ = ['channel', 'content', 'reply_to', 'priority', 'queued_at', 'attempts']
+
+    def __init__(self, channel, content, reply_to=None, priority=SendPriority.LOW):
+        self.channel = channel
+        self.content = content
+        self.reply_to = reply_to
+        self.priority = priority
+        self.queued_at = time.time()
+        self.attempts = 0
+
+    def to_line(self):
+        if self.reply_to:
+            return f"@reply-parent-msg-id={self.reply_to} PRIVMSG #{self.channel} :{self.content}"
+        return f"PRIVMSG #{self.channel} :{self.content}"
+
+
+class SendLane:
+    """
+    A set of per-channel FIFO queues which are served round-robin, so one busy
+    channel can't starve the others sharing the lane.
+    """
+    __slots__ = ['queues', 'order', 'size']
+
+    def __init__(self):
+        self.queues = {}
+        self.order = deque()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def put(self, message):
+        self.size += 1
+        queue = self.queues.get(message.channel)
+        if queue is None:
+            queue = self.queues[message.channel] = deque()
+            self.order.append(message.channel)
+        queue.append(message)
+
+    def push_front(self, message):
+        self.size += 1
+        queue = self.queues.get(message.channel)
+        if queue is None:
+            queue = self.queues[message.channel] = deque()
+            self.order.appendleft(message.channel)
+        queue.appendleft(message)
+
+    def last(self, channel):
+        queue = self.queues.get(channel)
+        return queue[-1] if queue else None
+
+    def take(self, can_send):
+        """
+        Pops the next message of the first channel (in round-robin order) for
+        which `can_send(message)` allows a send, or returns None.
+        """
+        for _ in range(len(self.order)):
+            channel = self.order[0]
+            self.order.rotate(-1)
+
+            queue = self.queues[channel]
+            if not can_send(queue[0]):
+                continue
+
+            message = queue.popleft()
+            self.size -= 1
+            if not queue:
+                # We just rotated it to the back, so this drops exactly this channel
+                self.order.pop()
+                del self.queues[channel]
+            return message
+
+        return None
+
+
+class SendQueue(LoggingClass):
+    """
+    Paces outbound chat messages against Twitch's rate limits instead of
+    writing them to the socket as soon as they're produced (which gets them
+    silently dropped, or the connection closed).
+
+    Every message needs a token from both the global bucket (per account) and
+    its channel's bucket. Messages in the `SendPriority.HIGH` lane always go
+    before the `SendPriority.LOW` lane, and within a lane channels are served
+    round-robin.
+
+    The queue also follows what Twitch tells us: `msg_ratelimit` notices pause
+    all sends with an exponential backoff, slow mode (from `client.state`,
+    unless we're exempt there) and timeouts hold a channel until it may talk
+    again, and messages which would be
+    rejected as duplicates are dropped or held (see `DuplicatePolicy`).
+
+    Parameters
+    ----------
+    client : :class:`twitch.client.Client`
+        The client this queue belongs to.
+    send : function
+        Called with every raw line once it is allowed to go out.
+    """
+    def __init__(self, client, send):
+        super(SendQueue, self).__init__()
+
+        # TODO: CONFIG
+        self.message_rate = client.config.get('irc_message_rate', (20, 30))
+        self.channel_message_rate = client.config.get('irc_channel_message_rate', (1, 1))
+        self.max_channel_depth = client.config.get('irc_max_channel_queue', 100)
+        self.duplicate_policy = client.config.get('irc_duplicate_policy', DuplicatePolicy.DROP)
+        self.ratelimit_backoff = client.config.get('irc_ratelimit_backoff', (5, 120))
+        self.idle_interval = 0.05
+        self.max_send_attempts = 3
+        self.sweep_interval = 60
+        # TODO: CONFIG END
+
+        self.lanes = {priority: SendLane() for priority in SendPriority.ALL}
+        self.limiter = SimpleLimiter(*self.message_rate)
+        self.channel_limiters = {}
+
+        self.sent = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        self._client = client
+        self._send = send
+        self._wakeup = gevent.event.Event()
+        self._task = None
+        self._listeners = []
+
+        # Mapping of channel to (content, time) of the last message we sent there
+        self._last_sent = {}
+
+        # Mapping of channel to the time it may be sent to again (timeouts, slow mode notices)
+        self._held_until = {}
+
+        self._paused_until = 0
+        self._backoff = 0
+        self._last_ratelimit = 0
+        self._last_sweep = time.time()
+
+    @property
+    def depth(self):
+        return sum(len(lane) for lane in self.lanes.values())
+
+    @property
+    def metrics(self):
+        """
+        A snapshot of the queue depths (overall, per lane and per channel) along
+        with the amount of messages sent and dropped so far.
+        """
+        channels = {}
+        for lane in self.lanes.values():
+            for channel, queue in lane.queues.items():
+                channels[channel] = channels.get(channel, 0) + len(queue)
+
+        return {
+            'depth': sum(channels.values()),
+            'lanes': {priority: len(lane) for priority, lane in self.lanes.items()},
+            'channels': channels,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'rejected': self.rejected,
+            'paused_for': max(0, self._paused_until - time.time()),
+            'held_channels': sum(1 for until in self._held_until.values() if until > time.time()),
+        }
+
+    def put(self, channel, content, reply_to=None, priority=SendPriority.LOW):
+        """
+        Queues a chat message for sending, returning whether it was accepted.
+        """
+        lane = self.lanes[priority]
+        queue = lane.queues.get(channel)
+        if queue is not None and len(queue) >= self.max_channel_depth:
+            self.dropped += 1
+            self.log.warning('Outbound queue for #%s is full, dropping message', channel)
+            return False
+
+        if self.duplicate_policy == DuplicatePolicy.DROP and self._is_duplicate(channel, content):
+            self.dropped += 1
+            self.log.debug('Dropping duplicate message to #%s', channel)
+            return False
+
+        lane.put(OutboundMessage(channel, content, reply_to, priority))
+
+        if not self._task:
+            self._start()
+        self._wakeup.set()
+        return True
+
+    def _start(self):
+        # Only bind once something is queued, so idle queues don't listen for anything
+        self._listeners = [
+            self._client.events.on('ChatNotice', self.on_notice),
+        ]
+        self._task = gevent.spawn(self._loop)
+
+    def _is_duplicate(self, channel, content):
+        # Compare against the message which will go out right before this one
+        previous = None
+        for lane in self.lanes.values():
+            message = lane.last(channel)
+            if message and (not previous or message.queued_at > previous.queued_at):
+                previous = message
+
+        if previous:
+            return previous.content == content
+
+        last = self._last_sent.get(channel)
+        return bool(last) and last[0] == content and time.time() - last[1] < DUPLICATE_WINDOW
+
+    def on_notice(self, event):
+        if not event.id:
+            return
+
+        now = time.time()
+
+        if event.id == 'msg_ratelimit':
+            self.rejected += 1
+            low, high = self.ratelimit_backoff
+
+            # Keep doubling while the notices keep coming, start over once things calm down
+            if now - self._last_ratelimit > high:
+                self._backoff = low
+            else:
+                self._backoff = min(high, max(low, self._backoff * 2))
+
+            self._last_ratelimit = now
+            self._paused_until = now + self._backoff
+            self.log.warning('Hit the chat rate limit, pausing sends for %ss', self._backoff)
+        elif event.id in ('msg_slowmode', 'msg_timedout'):
+            self.rejected += 1
+            match = NOTICE_SECONDS_RE.search(event.message or '')
+            if match:
+                self._held_until[event.channel] = now + int(match.group(1))
+        elif event.id == 'msg_duplicate':
+            self.rejected += 1
+            self.log.debug('Twitch rejected a duplicate message to #%s', event.channel)
+        elif event.id in ('msg_banned', 'msg_channel_suspended'):
+            self.rejected += 1
+            self.clear(event.channel)
+
+    def forget(self, channel):
+        """
+        Drops the pacing state kept for a channel (its bucket, last message and
+        any hold), e.g. once we've left it. Queued messages are kept.
+        """
+        self.channel_limiters.pop(channel, None)
+        self._last_sent.pop(channel, None)
+        self._held_until.pop(channel, None)
+
+    def _sweep(self):
+        # Channels we stopped talking in would otherwise keep their state forever
+        now = time.time()
+        self._last_sweep = now
+
+        queued = set()
+        for lane in self.lanes.values():
+            queued.update(lane.queues)
+
+        for channel in set(self.channel_limiters) | set(self._last_sent) | set(self._held_until):
+            if channel in queued or self._held_until.get(channel, 0) > now:
+                continue
+
+            last = self._last_sent.get(channel)
+            if last and now - last[1] < IDLE_CHANNEL_TIMEOUT:
+                continue
+
+            self.forget(channel)
+
+    def _channel_limiter(self, channel):
+        limiter = self.channel_limiters.get(channel)
+        if not limiter:
+            limiter = self.channel_limiters[channel] = SimpleLimiter(*self.channel_message_rate)
+        return limiter
+
+    def _can_send(self, message):
+        channel = message.channel
+        now = time.time()
+
+        if self._held_until.get(channel, 0) > now:
+            return False
+
+        last = self._last_sent.get(channel)
+        if last:
+            state = self._client.state.get(channel)
+            if state and state.slowmode and not state.privileged and now - last[1] < state.slowmode:
+                return False
+
+            if last[0] == message.content and now - last[1] < DUPLICATE_WINDOW:
+                return False
+
+        return self._channel_limiter(channel).check(blocking=False)
+
+    def _take(self):
+        for priority in SendPriority.ALL:
+            message = self.lanes[priority].take(self._can_send)
+            if message:
+                return message
+        return None
+
+    def _loop(self):
+        while True:
+            if time.time() - self._last_sweep > self.sweep_interval:
+                self._sweep()
+
+            if not self.depth:
+                self._wakeup.clear()
+                self._wakeup.wait(timeout=self.sweep_interval)
+                continue
+
+            pause = self._paused_until - time.time()
+            if pause > 0:
+                gevent.sleep(pause)
+                continue
+
+            message = self._take()
+            if not message:
+                # Everything queued is waiting on its channel (bucket, slow mode or a hold)
+                gevent.sleep(self.idle_interval)
+                continue
+
+            self.limiter.check()
+
+            try:
+                self._send(message.to_line())
+            except Exception as e:
+                message.attempts += 1
+                if message.attempts >= self.max_send_attempts:
+                    self.dropped += 1
+                    self.log.warning('Failed to send queued message to #%s (%s), dropping it after %s attempts',
+                                     message.channel, e, message.attempts)
+                    continue
+
+                self.log.warning('Failed to send queued message to #%s (%s), retrying', message.channel, e)
+                self.lanes[message.priority].push_front(message)
+                gevent.sleep(1)
+                continue
+
+            self._last_sent[message.channel] = (message.content, time.time())
+            self.sent += 1
+
+    def clear(self, channel=None):
+        """
+        Drops every queued message, or only those for the given channel.
+        """
+        for lane in self.lanes.values():
+            if channel is None:
+                lane.queues.clear()
+                lane.order.clear()
+                lane.size = 0
+                continue
+
+            queue = lane.queues.pop(channel, None)
+            if queue is not None:
+                lane.order.remove(channel)
+                lane.size -= len(queue)
+
+    def shutdown(self):
+        for listener in self._listeners:
+            listener.remove()
+        self._listeners = []
+
+        if self._task:
+            self._task.kill()
+            self._task = None
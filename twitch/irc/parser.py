@@ -0,0 +1,226 @@
+try:
+    import regex as re
+except ImportError:
+    import re
+
+from collections.abc import Mapping
+
+from twitch.util.hashmap import HashMap
+
+# IRCv3 message-tag value escapes (https://ircv3.net/specs/extensions/message-tags#escaping-values)
+TAG_ESCAPES = {
+    ':': ';',
+    's': ' ',
+    '\\': '\\',
+    'r': '\r',
+    'n': '\n',
+}
+
+TAG_ESCAPE_RE = re.compile(r'\\(.?)', re.S)
+
+
+def _unescape_match(match):
+    char = match.group(1)
+    return TAG_ESCAPES.get(char, char)
+
+
+def unescape_tag_value(value):
+    """
+    Unescapes an IRCv3 tag value. Unknown escapes drop the backslash, and a
+    trailing lone backslash is removed, as per the spec.
+    """
+    if '\\' not in value:
+        return value
+    return TAG_ESCAPE_RE.sub(_unescape_match, value)
+
+
+def parse_tags(message, start, end):
+    """
+    Parses the tag section of a raw message between the two given offsets (not
+    including the leading `@`) into a `HashMap`.
+    """
+    tags = HashMap()
+
+    # str.split/partition run in C, which beats walking the offsets by hand here
+    for item in message[start:end].split(';'):
+        key, _, value = item.partition('=')
+        tags[key] = value
+
+    # Escapes are rare, so only pay for unescaping when the section contains any
+    if message.find('\\', start, end) != -1:
+        for key, value in tags.items():
+            if '\\' in value:
+                tags[key] = unescape_tag_value(value)
+
+    return tags
+
+
+class IRCTags(Mapping):
+    """
+    A read-only, lazily decoded view over the raw tag section of a message.
+
+    Keys are only located and unescaped the first time they are accessed, and
+    then cached. Iterating (or taking the length of) the view decodes
+    everything at once.
+    """
+    __slots__ = ('_raw', '_cache', '_decoded')
+
+    def __init__(self, raw=''):
+        self._raw = raw
+        self._cache = {}
+        self._decoded = not raw
+
+    def _find(self, key):
+        raw = self._raw
+        size = len(key)
+        pos = raw.find(key)
+
+        while pos != -1:
+            after = pos + size
+            # Make sure we matched a whole key, and not part of another key/value
+            if pos == 0 or raw[pos - 1] == ';':
+                if after == len(raw) or raw[after] == ';':
+                    return ''
+
+                if raw[after] == '=':
+                    end = raw.find(';', after)
+                    value = raw[after + 1:] if end == -1 else raw[after + 1:end]
+                    return unescape_tag_value(value) if '\\' in value else value
+
+            pos = raw.find(key, pos + 1)
+
+        return None
+
+    def decode(self):
+        """
+        Decodes every tag at once, returning the underlying dict. This is
+        cheaper than individual lookups when most of the tags will be read.
+        """
+        if not self._decoded:
+            self._cache = parse_tags(self._raw, 0, len(self._raw))
+            self._decoded = True
+        return self._cache
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            if self._decoded:
+                raise
+
+        value = self._find(key)
+        if value is None:
+            raise KeyError(key)
+
+        self._cache[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __len__(self):
+        return len(self.decode())
+
+    def __repr__(self):
+        return '<IRCTags {}>'.format(self._raw)
+
+
+def peek_command(message):
+    """
+    Returns the command of a raw line (the first line, for a multi-line frame)
+    without parsing anything else.
+    """
+    pos = 0
+    if message[:1] == '@':
+        pos = message.find(' ') + 1
+
+    if message[pos:pos + 1] == ':':
+        pos = message.find(' ', pos) + 1
+
+    if not pos and message[:1] in '@:':
+        return None
+
+    end = message.find(' ', pos)
+    return message[pos:end] if end != -1 else message[pos:].rstrip('\r\n')
+
+
+def parse(message):
+    """
+    Parses a single raw IRC (IRCv3) line in one pass over string offsets.
+
+    :param message: str
+    :return: tuple(:class:`IRCTags`, prefix, command, parameters) or None
+    """
+    if not message:
+        return None
+
+    end = len(message)
+    while end and message[end - 1] in '\r\n':
+        end -= 1
+
+    pos = 0
+    tags = None
+    prefix = None
+
+    if message[0] == '@':
+        space = message.find(' ', 1, end)
+        if space == -1:
+            return None
+
+        # Tags are decoded lazily, most handlers only ever read a couple of them
+        tags = IRCTags(message[1:space])
+        pos = space + 1
+        while pos < end and message[pos] == ' ':
+            pos += 1
+
+    if pos < end and message[pos] == ':':
+        space = message.find(' ', pos, end)
+        if space == -1:
+            return None
+
+        prefix = message[pos + 1:space]
+        pos = space + 1
+        while pos < end and message[pos] == ' ':
+            pos += 1
+
+    if pos >= end:
+        return None
+
+    if tags is None:
+        tags = IRCTags()
+
+    space = message.find(' ', pos, end)
+    if space == -1:
+        return tags, prefix, message[pos:end], []
+
+    command = message[pos:space]
+    parameters = []
+    pos = space + 1
+
+    while pos < end:
+        if message[pos] == ' ':
+            pos += 1
+            continue
+
+        if message[pos] == ':':
+            parameters.append(message[pos + 1:end])
+            break
+
+        space = message.find(' ', pos, end)
+        if space == -1:
+            parameters.append(message[pos:end])
+            break
+
+        parameters.append(message[pos:space])
+        pos = space + 1
+
+    return tags, prefix, command, parameters
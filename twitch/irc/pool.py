@@ -0,0 +1,220 @@
+from twitch.irc.client import IRCClient
+from twitch.irc.outbound import SendQueue, SendPriority
+from twitch.util.ingest import IngestQueue
+from twitch.util.limiter import SimpleLimiter
+from twitch.util.logging import LoggingClass
+
+
+class IRCShard(IRCClient):
+    """
+    A single connection owned by an :class:`IRCPool`. Behaves like a regular
+    `IRCClient`, but uses the pool's outbound queue, join limiter and ingest
+    queue. Reconnects (and rejoins its channels) like any other client, and
+    only reports back to its pool once it gives up reconnecting, so the
+    channels it held can be moved elsewhere, or when Twitch removes it from
+    a channel.
+    """
+    def __init__(self, pool, shard_id):
+        # Joins and messages are rate limited per account, so every shard shares the pool's
+        super(IRCShard, self).__init__(
+            pool._client,
+            outbound=pool.outbound,
+            join_limiter=pool.join_limiter,
+            ingest=pool.ingest,
+        )
+        self.pool = pool
+        self.shard_id = shard_id
+
+    def _enqueue(self, frame, kind):
+        # Frames are handled by the shard which read them, through the pool's queue
+        self.ingest.put((self, frame), kind)
+
+    def on_open(self):
+        self._token = self.pool._token
+        self._nick = self.pool._nick
+        super(IRCShard, self).on_open()
+
+    def connect_and_run(self):
+        try:
+            super(IRCShard, self).connect_and_run()
+        except Exception:
+            if self.shutting_down:
+                raise
+            self.log.exception('IRC shard %s gave up reconnecting: ', self.shard_id)
+            self.pool.on_shard_failed(self)
+
+    def _lose_channel(self, channel):
+        super(IRCShard, self)._lose_channel(channel)
+        self.pool.on_channel_lost(self, channel)
+
+
+class IRCPool(LoggingClass):
+    """
+    Spreads joined channels over several IRC connections, so a single socket
+    does not cap the amount of channels we can sit in (or stall all of them
+    when it gets slow). Every connection emits into the same `client.events`,
+    and batches its own JOINs against a join limiter shared by the whole pool.
+
+    Parameters
+    ----------
+    client : :class:`twitch.client.Client`
+        The client this pool belongs to.
+    channels_per_connection : int
+        The maximum amount of channels joined on a single connection.
+    join_rate : tuple(int, int)
+        How many JOINs we are allowed to send per amount of seconds, across
+        every connection (Twitch rate limits joins per account, not per socket).
+
+    Attributes
+    ----------
+    shards : list(:class:`IRCShard`)
+        Every connection this pool has opened.
+    channels : dict(str, :class:`IRCShard`)
+        Mapping of joined channel name to the connection which owns it.
+    """
+    def __init__(self, client, channels_per_connection=None, join_rate=None):
+        super(IRCPool, self).__init__()
+
+        self.channels_per_connection = channels_per_connection or client.config.get('irc_channels_per_connection', 100)
+        self.join_rate = join_rate or client.config.get('irc_join_rate', (20, 10))
+
+        self.shards = []
+        self.channels = {}
+        self.shutting_down = False
+        self._next_shard_id = 0
+
+        self.join_limiter = SimpleLimiter(*self.join_rate)
+
+        # Message rate limits are per account as well, so sends are paced by the pool
+        self.outbound = SendQueue(client, self.send)
+
+        # A single bounded queue for frames read by any shard
+        self.ingest = IngestQueue(
+            self._handle_frame,
+            size=client.config.get('ingest_queue_size', 10000),
+            workers=client.config.get('ingest_workers', 1),
+            policy=client.config.get('ingest_policy', 'block'),
+            drop_types=client.config.get('ingest_drop_types', []),
+            name='IRC pool',
+        )
+
+        self._client = client
+        self._token = None
+        self._nick = None
+
+    @staticmethod
+    def _handle_frame(item):
+        shard, frame = item
+        shard.handle_frame(frame)
+
+    def _pick_shard(self, exclude=None):
+        candidates = [
+            shard for shard in self.shards
+            if shard is not exclude and len(shard.channels) < self.channels_per_connection
+        ]
+
+        if candidates:
+            # Prefer connected shards, then the least loaded one
+            return min(candidates, key=lambda shard: (not shard.ready.is_set(), len(shard.channels)))
+
+        return self.add_shard()
+
+    def add_shard(self):
+        shard = IRCShard(self, self._next_shard_id)
+        self._next_shard_id += 1
+        self.shards.append(shard)
+        self.log.info('Opening IRC shard %s', shard.shard_id)
+        shard.run()
+        return shard
+
+    def join(self, channels, exclude=None):
+        """
+        Joins one or more channels, assigning each one to the least loaded
+        connection with room left (opening new connections as required).
+        """
+        if isinstance(channels, str):
+            channels = [channels]
+
+        for channel in channels:
+            channel = channel.lstrip('#').lower()
+            if channel in self.channels:
+                continue
+
+            shard = self._pick_shard(exclude=exclude)
+            self.channels[channel] = shard
+            shard.join(channel)
+
+    def part(self, channels):
+        """
+        Leaves one or more channels.
+        """
+        if isinstance(channels, str):
+            channels = [channels]
+
+        for channel in channels:
+            channel = channel.lstrip('#').lower()
+            shard = self.channels.pop(channel, None)
+            if shard:
+                shard.part(channel)
+
+    def on_shard_failed(self, shard):
+        """
+        Drops a connection which gave up reconnecting, moving every channel it
+        held onto the others (opening a new one if none has room).
+        """
+        if shard in self.shards:
+            self.shards.remove(shard)
+        shard.shutting_down = True
+        shard.shutdown()
+
+        moved = shard.release_channels()
+        if not moved or self.shutting_down:
+            return
+
+        self.log.warning('IRC shard %s failed, moving %s channels', shard.shard_id, len(moved))
+        for channel in moved:
+            if self.channels.get(channel) is shard:
+                del self.channels[channel]
+        self.join(moved)
+
+    def on_channel_lost(self, shard, channel):
+        """
+        Forgets a channel Twitch removed a connection from, so it can be joined again.
+        """
+        if self.channels.get(channel) is shard:
+            del self.channels[channel]
+
+    def send(self, data):
+        """
+        Sends a raw line over the connection which owns the channel it targets,
+        falling back to the first connection for lines without a channel.
+        """
+        shard = None
+        start = data.find(' #')
+        if start != -1:
+            end = data.find(' ', start + 2)
+            shard = self.channels.get(data[start + 2:end if end != -1 else None].lower())
+
+        if not shard:
+            if not self.shards:
+                raise Exception('IRCPool has no connections to send over, call run() first')
+            shard = self.shards[0]
+
+        return shard.send(data)
+
+    def send_message(self, channel, content, reply_to=None, priority=SendPriority.LOW):
+        """
+        Queues a chat message, which is sent once the rate limits allow it.
+        """
+        return self.outbound.put(channel, content, reply_to=reply_to, priority=priority)
+
+    def shutdown(self):
+        self.shutting_down = True
+        self.outbound.shutdown()
+        self.ingest.shutdown()
+        for shard in self.shards:
+            shard.shutdown()
+
+    def run(self):
+        if not self.shards:
+            self.add_shard()
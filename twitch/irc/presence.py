@@ -0,0 +1,125 @@
+import sys
+
+from twitch.util.logging import LoggingClass
+
+
+def parse_membership(line):
+    """
+    Picks apart an untagged `:nick!nick@nick.tmi.twitch.tv JOIN #channel` (or
+    PART) line without running it through the full parser.
+
+    :return: tuple(command, nick, channel) or None if the line is anything else.
+    """
+    if line[:1] != ':':
+        return None
+
+    space = line.find(' ')
+    if space == -1 or line[space + 6:space + 7] != '#':
+        return None
+
+    command = line[space + 1:space + 6]
+    if command != 'JOIN ' and command != 'PART ':
+        return None
+
+    bang = line.find('!', 1, space)
+    return command[:4], line[1:bang if bang != -1 else space], line[space + 7:]
+
+
+class PresenceIndex(LoggingClass):
+    """
+    Tracks which chatters are currently in each joined channel, from the NAMES
+    list Twitch sends on join and the JOIN/PART lines that follow it.
+
+    Twitch batches membership lines and sends them every few seconds, so they
+    are applied in bulk per received frame. Logins are interned, which means
+    a chatter sitting in many channels only costs one string.
+
+    Channels can opt out of tracking, in which case their JOIN/PART lines are
+    dropped before being parsed at all.
+
+    Attributes
+    ----------
+    channels : dict(str, set(str))
+        Mapping of channel name to the logins of the chatters in it.
+    """
+    def __init__(self, client):
+        super(PresenceIndex, self).__init__()
+
+        self.channels = {}
+
+        self._opted_out = set(
+            channel.lstrip('#').lower() for channel in client.config.get('irc_membership_opt_out', [])
+        )
+
+    def tracking(self, channel):
+        return channel not in self._opted_out
+
+    def opt_out(self, channel):
+        """
+        Stops tracking the chatters of a channel, dropping what we know of it.
+        """
+        channel = channel.lstrip('#').lower()
+        self._opted_out.add(channel)
+        self.channels.pop(channel, None)
+
+    def opt_in(self, channel):
+        """
+        Resumes tracking the chatters of a channel. Only those joining from now
+        on (or everyone, after the next rejoin) are known.
+        """
+        self._opted_out.discard(channel.lstrip('#').lower())
+
+    def chatters(self, channel):
+        return self.channels.get(channel.lstrip('#').lower(), set())
+
+    def is_present(self, channel, login):
+        return login.lower() in self.chatters(channel)
+
+    def reset(self, channel):
+        """
+        Empties a channel, Twitch will send its full NAMES list again.
+        """
+        if self.tracking(channel):
+            self.channels[channel] = set()
+
+    def forget(self, channel):
+        self.channels.pop(channel, None)
+
+    def add_names(self, channel, names):
+        if not self.tracking(channel):
+            return
+
+        chatters = self.channels.setdefault(channel, set())
+        chatters.update(sys.intern(name) for name in names)
+
+    def apply(self, batch):
+        """
+        Applies a batch of (command, login, channel) membership changes, in order.
+        """
+        channels = self.channels
+        intern = sys.intern
+
+        for command, login, channel in batch:
+            chatters = channels.get(channel)
+            if chatters is None:
+                if not self.tracking(channel):
+                    continue
+                chatters = channels[channel] = set()
+
+            if command == 'JOIN':
+                chatters.add(intern(login))
+            else:
+                chatters.discard(login)
+
+    @property
+    def memory(self):
+        """
+        The approximate amount of memory (in bytes) used per tracked channel,
+        counting the set itself plus every login in it. Logins are shared
+        between channels, so the sum over all channels overstates the total.
+        """
+        getsizeof = sys.getsizeof
+        return {
+            channel: getsizeof(chatters) + sum(getsizeof(login) for login in chatters)
+            for channel, chatters in self.channels.items()
+        }
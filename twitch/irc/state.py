@@ -0,0 +1,145 @@
+from twitch.util.emitter import Priority
+from twitch.util.hashmap import HashMap
+from twitch.util.logging import LoggingClass
+
+
+class ChannelState:
+    """
+    Everything we currently know about a joined channel, built up from the
+    ROOMSTATE and (our own) USERSTATE lines Twitch sends for it.
+
+    Room settings which Twitch hasn't told us about yet are None.
+    """
+    __slots__ = [
+        'id', 'name', 'emote_only', 'followers_only', 'unique_only', 'slowmode', 'sub_only',
+        'badges', 'color', 'display_name', 'emote_sets', 'mod', 'vip', 'broadcaster', 'subscriber',
+    ]
+
+    def __init__(self, name):
+        self.id = None
+        self.name = name
+
+        # Room settings (ROOMSTATE)
+        self.emote_only = None
+        self.followers_only = None
+        self.unique_only = None
+        self.slowmode = None
+        self.sub_only = None
+
+        # Our own user in the room (USERSTATE)
+        self.badges = {}
+        self.color = None
+        self.display_name = None
+        self.emote_sets = []
+        self.mod = False
+        self.vip = False
+        self.broadcaster = False
+        self.subscriber = False
+
+    @property
+    def privileged(self):
+        """
+        Whether we're exempt from the room's chat restrictions (slow mode,
+        followers/subs only, and the like).
+        """
+        return self.broadcaster or self.mod or self.vip
+
+    def __repr__(self):
+        return '<ChannelState {} ({})>'.format(self.name, self.id)
+
+
+class ChannelStateStore(LoggingClass):
+    """
+    Keeps an in-memory copy of the room settings and our own user state for
+    every channel we're in, so plugins (and the send queue) can look them up
+    without asking the API.
+
+    ROOMSTATE updates are applied as deltas, since Twitch only includes the
+    settings which changed after the initial one on join.
+
+    Attributes
+    ----------
+    channels : dict(int, :class:`ChannelState`)
+        Mapping of channel id to its state.
+    """
+    EVENTS = [
+        'ChatRoomUpdate', 'ChatUserState',
+    ]
+
+    def __init__(self, client):
+        super(ChannelStateStore, self).__init__()
+        self.client = client
+
+        self.channels = HashMap()
+
+        # Mapping of channel name to its state, which also holds the channels
+        #  we've had a USERSTATE for but not yet a ROOMSTATE (and thus no id)
+        self._by_name = {}
+
+        self.listeners = []
+        self.bind()
+
+    def bind(self):
+        for listener in self.listeners:
+            listener.remove()
+
+        self.listeners = [
+            self.client.events.on(event, getattr(self, 'on_' + event[4:].lower()), priority=Priority.BEFORE)
+            for event in self.EVENTS
+        ]
+
+    def get(self, channel):
+        """
+        Returns the state of a channel by either its id or name, or None.
+        """
+        if isinstance(channel, int):
+            return self.channels.get(channel)
+        return self._by_name.get(channel.lstrip('#').lower())
+
+    def _get_or_create(self, name):
+        state = self._by_name.get(name)
+        if state is None:
+            state = self._by_name[name] = ChannelState(name)
+        return state
+
+    def forget(self, channel):
+        """
+        Drops the state for a channel we are no longer in.
+        """
+        state = self.get(channel)
+        if not state:
+            return
+
+        del self._by_name[state.name]
+        if state.id is not None:
+            self.channels.pop(state.id, None)
+
+    def on_roomupdate(self, event):
+        state = self._get_or_create(event.channel)
+
+        if event.channel_id and state.id != event.channel_id:
+            state.id = event.channel_id
+            self.channels[state.id] = state
+
+        for field in ('emote_only', 'followers_only', 'unique_only', 'slowmode', 'sub_only'):
+            value = getattr(event, field)
+            if value is not None:
+                setattr(state, field, value)
+
+    def on_userstate(self, event):
+        state = self._get_or_create(event.channel)
+
+        badges = {}
+        if event.badges:
+            for badge in event.badges.split(','):
+                name, _, version = badge.partition('/')
+                badges[name] = version
+
+        state.badges = badges
+        state.color = event.color
+        state.display_name = event.display_name
+        state.emote_sets = event.emote_sets
+        state.mod = event.mod or 'moderator' in badges
+        state.vip = 'vip' in badges
+        state.broadcaster = 'broadcaster' in badges
+        state.subscriber = event.subscriber
@@ -1,19 +1,26 @@
 import functools
 import gevent
 import inspect
+import re
 
-from datetime import datetime as real_datetime
+from datetime import datetime as real_datetime, timedelta, timezone
 from twitch.util.metaclass import with_metaclass
 
 from twitch.util.chains import Chainable
-from twitch.util.enum import get_enum_members
+from twitch.util.enum import get_enum_table
 from twitch.util.hashmap import HashMap
 
-DATETIME_FORMATS = [
-    '%Y-%m-%dT%H:%M:%S.%f',
-    '%Y-%m-%dT%H:%M:%S',
-    '%Y-%m-%dT%H:%M:%S.%fZ'
-]
+try:
+    from ujson import dump as json_dump, dumps as json_dumps
+except ImportError:
+    from json import dump as json_dump, dumps as json_dumps
+
+# RFC3339 timestamps, as sent by Twitch ('2023-01-01T12:00:00.123456789Z'). The
+#  fraction can be anywhere from 1 to 9 digits (or absent) and is padded or cut
+#  down to microseconds, and the offset may be missing (giving a naive datetime)
+RFC3339_RE = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)[Tt ](\d\d):(\d\d):(\d\d)(?:\.(\d+))?(?:([Zz])|([+-])(\d\d):(\d\d))?$'
+)
 
 
 def get_item_by_path(obj, path):
@@ -190,35 +197,62 @@ def snowflake(data):
 
 
 def enum(typ):
+    # Built once per enum class, rather than walking the class on every conversion
+    table = get_enum_table(typ)
+    members, values = table.members, table.values
+
     def _f(data):
         if data is None:
             return None
 
-        for k, v in get_enum_members(typ):
-            if isinstance(data, str) and k == data.upper():
-                return v
-            elif k == data or v == data:
-                return v
+        if isinstance(data, str):
+            member = members.get(data.upper())
+            if member is not None:
+                return member
 
-        return None
+        try:
+            return values.get(data)
+        except TypeError:
+            return None
     return _f
 
 
+@functools.lru_cache(maxsize=512)
+def parse_rfc3339(data):
+    """
+    Parses an RFC3339 timestamp into a datetime, UTC ones ('Z') are timezone
+    aware. Results are cached, since the same timestamps tend to come up in
+    event after event (e.g. the `started_at` of a hype train on every progress).
+    """
+    match = RFC3339_RE.match(data)
+    if not match:
+        return real_datetime.fromisoformat(data)
+
+    year, month, day, hour, minute, second, fraction, utc, sign, offset_hours, offset_minutes = match.groups()
+
+    tzinfo = None
+    if utc:
+        tzinfo = timezone.utc
+    elif sign:
+        offset = timedelta(hours=int(offset_hours), minutes=int(offset_minutes))
+        tzinfo = timezone(-offset if sign == '-' else offset)
+
+    return real_datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second),
+        int(fraction[:6].ljust(6, '0')) if fraction else 0,
+        tzinfo,
+    )
+
+
 def datetime(data):
     if not data:
         return None
 
     if isinstance(data, int):
-        return real_datetime.utcfromtimestamp(data)
-
-    for fmt in DATETIME_FORMATS:
-        try:
-            return real_datetime.strptime(f"{data[:-2]}Z", fmt)
-        except (ValueError, TypeError):
-            continue
+        return real_datetime.fromtimestamp(data, timezone.utc)
 
     try:
-        return real_datetime.fromisoformat(data)
+        return parse_rfc3339(data)
     except (ValueError, TypeError):
         raise ValueError('Failed to convert `{}` to datetime'.format(data))
 
@@ -284,6 +318,107 @@ def _get_cached_property(name, func):
     return prop
 
 
+def _compile_loader(cls):
+    """
+    Generates a `load_into` specialized for the given model class, with its
+    fields, defaults and converters inlined instead of looked up and checked
+    for every field of every instance loaded.
+    """
+    namespace = {'UNSET': UNSET, 'ConversionError': ConversionError}
+    lines = ['def load_into(inst, obj):', '    get = obj.get', '    client = inst.client']
+
+    for index, field in enumerate(cls._fields.values()):
+        namespace['src_{}'.format(index)] = field.src_name
+        namespace['field_{}'.format(index)] = field
+        lines.append('    raw = get(src_{})'.format(index))
+
+        # Mirrors the generic `Model.load_into` loop, see there for the reasoning
+        if field.has_default():
+            namespace['default_{}'.format(index)] = field.default
+            lines.append('    if raw is None or raw is UNSET:')
+            if callable(field.default):
+                lines.append('        inst.{} = default_{}()'.format(field.dst_name, index))
+            else:
+                lines.append('        inst.{} = default_{}'.format(field.dst_name, index))
+        else:
+            lines.append('    if raw is None:')
+            lines.append('        inst.{} = None'.format(field.dst_name))
+
+        lines.append('    else:')
+
+        deserializer = field.deserializer
+        if type(field) is Field and inspect.isclass(deserializer) and issubclass(deserializer, Model):
+            # Nested models are built directly, they raise their own ConversionErrors
+            namespace['model_{}'.format(index)] = deserializer
+            convert = 'model_{}(raw, client)'.format(index)
+        elif type(field) is Field and field.true_type is not None and not isinstance(deserializer, Field):
+            # Plain conversions (int, text, datetime, ...) skip the deserializer wrapper
+            namespace['type_{}'.format(index)] = field.true_type
+            convert = 'type_{}(raw)'.format(index)
+        else:
+            lines.append('        inst.{} = field_{}.try_convert(raw, client)'.format(field.dst_name, index))
+            continue
+
+        lines.extend([
+            '        try:',
+            '            value = {}'.format(convert),
+            '        except Exception as e:',
+            '            raise ConversionError(field_{}, raw, e)'.format(index),
+            '        inst.{} = value'.format(field.dst_name),
+        ])
+
+    exec(compile('\n'.join(lines), '<{}.load_into>'.format(cls.__name__), 'exec'), namespace)
+    cls._loader = namespace['load_into']
+    return cls._loader
+
+
+# Values `Field.serialize` passes through untouched (without a cast)
+_PLAIN_TYPES = frozenset((str, int, float, bool))
+
+
+def _compile_dumper(cls):
+    """
+    Generates a `to_dict` specialized for the given model class, which reads
+    every field once and only goes through `Field.serialize` for values that
+    actually need converting (datetimes, models and so on).
+    """
+    namespace = {'PLAIN': _PLAIN_TYPES, 'DATETIME': real_datetime, 'serialize': Field.serialize}
+    lines = ['def to_dict(inst):', '    obj = {}']
+
+    for index, (name, field) in enumerate(cls._fields.items()):
+        if field.metadata.get('private'):
+            continue
+
+        namespace['field_{}'.format(index)] = field
+        lines.extend([
+            '    value = inst.{}'.format(name),
+            '    if value is not None:',
+        ])
+
+        fallback = 'serialize(value, field_{})'.format(index)
+        deserializer = field.deserializer
+        if field.serialize is Field.serialize and inspect.isclass(deserializer) and issubclass(deserializer, Model) \
+                and not field.ignore_dump:
+            namespace['model_{}'.format(index)] = deserializer
+            value = 'value.to_dict() if value.__class__ is model_{} else {}'.format(index, fallback)
+        elif field.serialize is Field.serialize and field.true_type is datetime:
+            value = 'value.isoformat() if value.__class__ is DATETIME else {}'.format(fallback)
+        elif field.serialize is Field.serialize and not field.cast:
+            value = 'value if value.__class__ in PLAIN else {}'.format(fallback)
+        elif field.serialize is ListField.serialize:
+            value = '[v if v.__class__ in PLAIN else serialize(v) for v in value]'
+        else:
+            value = 'field_{0}.serialize(value, field_{0})'.format(index)
+
+        lines.append('        obj[{!r}] = {}'.format(name, value))
+
+    lines.append('    return obj')
+
+    exec(compile('\n'.join(lines), '<{}.to_dict>'.format(cls.__name__), 'exec'), namespace)
+    cls._dumper = namespace['to_dict']
+    return cls._dumper
+
+
 class ModelMeta(type):
     def __new__(mcs, name, parents, dct):
         fields = {}
@@ -315,6 +450,10 @@ class ModelMeta(type):
             dct = {k: v for k, v in dct.items() if k not in fields}
 
         dct['_fields'] = fields
+
+        # Compiled by `_compile_loader`/`_compile_dumper` on first use, after any decorators have added fields
+        dct['_loader'] = None
+        dct['_dumper'] = None
         return super(ModelMeta, mcs).__new__(mcs, name, parents, dct)
 
 
@@ -351,6 +490,10 @@ class Model(with_metaclass(ModelMeta, Chainable)):
 
     @classmethod
     def load_into(cls, inst, obj, consume=False):
+        if not consume:
+            (cls._loader or _compile_loader(cls))(inst, obj)
+            return
+
         for name, field in cls._fields.items():
             try:
                 raw = obj[field.src_name]
@@ -391,6 +534,9 @@ class Model(with_metaclass(ModelMeta, Chainable)):
                     pass
 
     def to_dict(self, ignore=None):
+        if not ignore:
+            return (self.__class__._dumper or _compile_dumper(self.__class__))(self)
+
         obj = {}
         for name, field in self.__class__._fields.items():
             if ignore and name in ignore:
@@ -404,22 +550,59 @@ class Model(with_metaclass(ModelMeta, Chainable)):
             obj[name] = field.serialize(getattr(self, name), field)
         return obj
 
+    def dumps(self):
+        """
+        Returns this model encoded as JSON.
+        """
+        return json_dumps(self.to_dict())
+
+    def dump(self, fp):
+        """
+        Writes this model encoded as JSON into the given file-like object,
+        handing the encoder `fp` directly rather than building the string first.
+        """
+        json_dump(self.to_dict(), fp)
+
     @classmethod
     def create(cls, client, data, **kwargs):
         data.update(kwargs)
         inst = cls(data, client)
         return inst
 
+    @classmethod
+    def create_many(cls, client, data, **kwargs):
+        """
+        Creates an instance for every item of data. Unless the class customizes
+        how it's created this loads every item with the compiled loader directly.
+        """
+        if cls.create.__func__ is not Model.create.__func__ or cls.__init__ is not Model.__init__ or \
+                cls.validate is not Model.validate:
+            return [cls.create(client, item, **kwargs) for item in data]
+
+        loader = cls._loader or _compile_loader(cls)
+        new = cls.__new__
+
+        result = []
+        for item in data:
+            if kwargs:
+                item.update(kwargs)
+            inst = new(cls)
+            inst.client = client
+            loader(inst, item)
+            result.append(inst)
+        return result
+
     @classmethod
     def create_map(cls, client, data, *args, **kwargs):
-        return list(map(functools.partial(cls.create, client, *args, **kwargs), data))
+        if args:
+            return list(map(functools.partial(cls.create, client, *args, **kwargs), data))
+        return cls.create_many(client, data, **kwargs)
 
     @classmethod
     def create_hash(cls, client, key, data, **kwargs):
         return HashMap({
             get_item_by_path(item, key): item
-            for item in [
-                cls.create(client, item, **kwargs) for item in data]
+            for item in cls.create_many(client, data, **kwargs)
         })
 
     @classmethod
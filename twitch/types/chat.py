@@ -1,4 +1,85 @@
-from twitch.types.base import SlottedModel, text, Field, DictField, ListField
+from functools import lru_cache
+
+from twitch.irc.outbound import SendPriority
+from twitch.types.base import SlottedModel, text, Field, DictField, ListField, BitsetMap, BitsetValue
+
+
+class ChatBadges(BitsetMap):
+    BROADCASTER = 1 << 0
+    MODERATOR = 1 << 1
+    VIP = 1 << 2
+    SUBSCRIBER = 1 << 3
+    FOUNDER = 1 << 4
+    ARTIST = 1 << 5
+    STAFF = 1 << 6
+    ADMIN = 1 << 7
+    GLOBAL_MOD = 1 << 8
+    PARTNER = 1 << 9
+    TURBO = 1 << 10
+    PREMIUM = 1 << 11
+
+
+class ChatBadgeValue(BitsetValue):
+    map = ChatBadges
+
+
+# Mapping of badge name (as sent in the `badges` tag) to its `ChatBadges` flag
+BADGE_FLAGS = {
+    'broadcaster': ChatBadges.BROADCASTER,
+    'moderator': ChatBadges.MODERATOR,
+    'vip': ChatBadges.VIP,
+    'subscriber': ChatBadges.SUBSCRIBER,
+    'founder': ChatBadges.FOUNDER,
+    'artist-badge': ChatBadges.ARTIST,
+    'staff': ChatBadges.STAFF,
+    'admin': ChatBadges.ADMIN,
+    'global_mod': ChatBadges.GLOBAL_MOD,
+    'partner': ChatBadges.PARTNER,
+    'turbo': ChatBadges.TURBO,
+    'premium': ChatBadges.PREMIUM,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_badges(badges):
+    """
+    Turns a `badges` tag (`<name>/<version>,...`) into a `ChatBadges` bitmask.
+    The same few combinations show up on nearly every line, so results are cached.
+    """
+    flags = 0
+    if badges:
+        for badge in badges.split(','):
+            flags |= BADGE_FLAGS.get(badge.partition('/')[0], 0)
+    return flags
+
+
+@lru_cache(maxsize=4096)
+def split_badges(badges):
+    """
+    Splits a `badges` tag into `(name, version)` pairs, cached like `parse_badges`.
+    """
+    if not badges:
+        return ()
+
+    pairs = []
+    for badge in badges.split(','):
+        name, _, version = badge.partition('/')
+        pairs.append((name, int(version) if version.isdigit() else None))
+    return tuple(pairs)
+
+
+def parse_subscriber_months(badge_info):
+    """
+    Reads the exact amount of months subscribed from a `badge-info` tag.
+    """
+    if not badge_info:
+        return 0
+
+    for badge in badge_info.split(','):
+        name, _, months = badge.partition('/')
+        if name == 'subscriber' or name == 'founder':
+            return int(months) if months.isdigit() else 0
+    return 0
 
 
 class ChatBadge(SlottedModel):
@@ -7,6 +88,7 @@ class ChatBadge(SlottedModel):
 
 
 class ChatEmoji(SlottedModel):
+    id = Field(text)
     name = Field(text)
     url = Field(text)
 
@@ -16,6 +98,8 @@ class ChatUser(SlottedModel):
     username = Field(text)
     display_name = Field(text)
     badges = ListField(ChatBadge)
+    badge_flags = Field(ChatBadgeValue, cast=int, default=ChatBadgeValue)
+    subscriber_months = Field(int)
     chat_color = Field(text)
     mod = Field(bool)
     returning_chatter = Field(bool)
@@ -39,8 +123,8 @@ class ChatMessage(SlottedModel):
 
     def reply(self, content):
         # @reply-parent-msg-id=885196de-cb67-427a-baa8-82f9b0fcd05f PRIVMSG #lovingt3s :absolutely!
-        self.client.irc.send(f"@reply-parent-msg-id={self.id} PRIVMSG #{self.channel} :{content}")
+        self.client.irc.send_message(self.channel, content, reply_to=self.id, priority=SendPriority.HIGH)
 
-    def send_message(self, content):
-        self.client.irc.send(f"PRIVMSG #{self.channel} :{content}")
+    def send_message(self, content, priority=SendPriority.LOW):
+        self.client.irc.send_message(self.channel, content, priority=priority)
 
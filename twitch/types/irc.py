@@ -1,5 +1,4 @@
-import copy
-
+from twitch.irc.parser import parse
 from twitch.types.base import SlottedModel, Field, DictField, ListField
 
 
@@ -17,34 +16,16 @@ class IRCRawMessage(SlottedModel):
         :param message: str
         :return: RawMessage
         """
-        if not message:
+        parsed = parse(message)
+        if not parsed:
             return None
 
-        parts = message.split(' ')
-
-        prefix = None
-        tags = {}
-        parameters = []
-
-        if parts[0].startswith('@'):
-            tags_str = parts.pop(0)[1:]
-            tags_list = tags_str.split(';')
-            tags = {tag.split('=')[0]: tag.split('=')[1] for tag in tags_list}
-
-        # Parse prefix
-        if parts[0].startswith(':'):
-            prefix = parts.pop(0)[1:]
-
-        # Parse command
-        command = parts.pop(0)
-
-        # Parse params
-        while parts:
-            if parts[0].startswith(':'):
-                parameters.append(' '.join(parts)[1:].rstrip('\r\n'))
-                break
-            parameters.append(parts.pop(0).rstrip('\r\n'))
-        return cls(prefix=prefix, tags=tags, command=command, parameters=parameters, raw=copy.copy(message))
+        # Skip the generic Model loader, the parser already hands us the final types
+        inst = cls.__new__(cls)
+        inst.client = None
+        inst.tags, inst.prefix, inst.command, inst.parameters = parsed
+        inst.raw = message
+        return inst
 
     def to_json(self):
         to_deploy = {}
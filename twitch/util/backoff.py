@@ -0,0 +1,34 @@
+import random
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: every failure doubles the ceiling
+    (up to `max_delay`), and the actual delay is picked at random between 0
+    and it, so many clients failing at once (the first retry included) don't
+    all retry at the same moment.
+    """
+    __slots__ = ['min_delay', 'max_delay', 'jitter', 'failures', '_ceiling']
+
+    def __init__(self, min_delay=1, max_delay=120, jitter=True):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failures = 0
+        self._ceiling = min_delay
+
+    def reset(self):
+        self.failures = 0
+        self._ceiling = self.min_delay
+
+    def fail(self):
+        """
+        Records a failure, returning how long to wait before trying again.
+        """
+        self.failures += 1
+        delay = self._ceiling
+        self._ceiling = min(self.max_delay, self._ceiling * 2)
+
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
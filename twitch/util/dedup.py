@@ -0,0 +1,80 @@
+import time
+
+from collections import deque
+
+
+class DedupWindow:
+    """
+    Remembers recently seen ids, bounded by both count and age, with O(1)
+    lookups and inserts.
+
+    Ids are stored as their hash in a handful of generational sets. New ids
+    go into the newest generation, and once it is full (or old) a fresh one
+    is started and the oldest generation is dropped whole, so nothing has to
+    be expired one id at a time. The window therefore holds between
+    `(generations - 1) / generations` and all of `max_size` ids (or seconds).
+
+    Hashes are only comparable within a single process, which is all this is
+    meant for.
+
+    Parameters
+    ----------
+    max_size : int
+        Roughly how many ids to remember.
+    max_age : float
+        Roughly how long (in seconds) to remember an id for, None for no limit.
+    generations : int
+        How many sets the window is split over.
+    """
+    __slots__ = ['max_size', 'max_age', 'generations', '_generation_size', '_generation_age', '_sets']
+
+    def __init__(self, max_size=200000, max_age=None, generations=4):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.generations = generations
+
+        self._generation_size = max(1, max_size // generations)
+        self._generation_age = max_age / generations if max_age else None
+
+        # (started at, set of hashes), newest last
+        self._sets = deque([(time.monotonic(), set())])
+
+    def __len__(self):
+        return sum(len(ids) for _, ids in self._sets)
+
+    def __contains__(self, item):
+        key = hash(item)
+        for _, ids in self._sets:
+            if key in ids:
+                return True
+        return False
+
+    def _rotate(self):
+        now = time.monotonic()
+        started, newest = self._sets[-1]
+
+        if len(newest) >= self._generation_size or (self._generation_age and now - started >= self._generation_age):
+            self._sets.append((now, set()))
+            if len(self._sets) > self.generations:
+                self._sets.popleft()
+
+        # Drop whatever is past the max age even if nothing new came in
+        if self.max_age:
+            while len(self._sets) > 1 and now - self._sets[0][0] >= self.max_age:
+                self._sets.popleft()
+
+    def add(self, item):
+        """
+        Remembers an id, returning False if it was already in the window.
+        """
+        key = hash(item)
+        for _, ids in self._sets:
+            if key in ids:
+                return False
+
+        self._rotate()
+        self._sets[-1][1].add(key)
+        return True
+
+    def clear(self):
+        self._sets = deque([(time.monotonic(), set())])
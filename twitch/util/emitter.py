@@ -151,6 +151,13 @@ class Emitter(LoggingClass):
         for listener in self.event_handlers[Priority.NONE].get(name, []):
             gevent.spawn(listener, *args, **kwargs)
 
+    def has_listeners(self, name):
+        """
+        Whether anything is subscribed to the given event, so callers can skip
+        building events nobody will receive.
+        """
+        return any(handlers.get(name) for handlers in self.event_handlers.values())
+
     def on(self, *args, **kwargs):
         return EmitterSubscription(args[:-1], args[-1], **kwargs).attach(self)
 
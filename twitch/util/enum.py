@@ -1,3 +1,6 @@
+from types import MappingProxyType
+
+
 def get_enum_members(enum):
     for k, v in enum.__dict__.items():
         if not isinstance(k, str):
@@ -9,9 +12,47 @@ def get_enum_members(enum):
         yield k, v
 
 
-def get_enum_value_by_name(enum, name):
-    name = name.lower()
+class EnumTable:
+    """
+    Lookup tables for an enum class, built once so converting a name or value
+    to its member doesn't have to walk the class every time.
+
+    Attributes
+    ----------
+    members : mapping(str, object)
+        The member values by name.
+    names : mapping(str, object)
+        The member values by lower-cased name.
+    values : mapping(object, object)
+        The member values by name and value, for the `enum` field converter.
+    """
+    __slots__ = ['members', 'names', 'values']
+
+    def __init__(self, enum):
+        members, names, values = {}, {}, {}
+        for k, v in get_enum_members(enum):
+            members[k] = v
+            names.setdefault(k.lower(), v)
+            values.setdefault(k, v)
+            try:
+                values.setdefault(v, v)
+            except TypeError:
+                pass
+
+        self.members = MappingProxyType(members)
+        self.names = MappingProxyType(names)
+        self.values = MappingProxyType(values)
 
-    for k, v in get_enum_members(enum):
-        if k.lower() == name:
-            return v
+
+_TABLES = {}
+
+
+def get_enum_table(enum):
+    table = _TABLES.get(enum)
+    if table is None:
+        table = _TABLES[enum] = EnumTable(enum)
+    return table
+
+
+def get_enum_value_by_name(enum, name):
+    return get_enum_table(enum).names.get(name.lower())
@@ -0,0 +1,168 @@
+import time
+
+from collections import deque
+
+import gevent
+import gevent.event
+
+from twitch.util.logging import LoggingClass
+from twitch.util.metrics import Histogram
+
+
+class OverflowPolicy:
+    # Make the producer (the websocket reader) wait for room
+    BLOCK = 'block'
+
+    # Throw away the oldest queued item to make room
+    DROP_OLDEST = 'drop_oldest'
+
+    # Throw away an item of one of the droppable kinds (the incoming one if it is
+    #  droppable, otherwise the oldest droppable one queued), blocking if there is none
+    DROP_TYPE = 'drop_type'
+
+
+class IngestQueue(LoggingClass):
+    """
+    A bounded queue between a websocket reader and the code dispatching what
+    it read, so slow event handlers can't stall the socket.
+
+    Items are handed to `handler` by a pool of worker greenlets. With a single
+    worker items are handled in the order they were read, with more there are
+    no ordering guarantees between items.
+
+    Parameters
+    ----------
+    handler : function
+        Called with every queued item, from a worker greenlet.
+    size : int
+        The maximum amount of queued items.
+    workers : int
+        The amount of worker greenlets.
+    policy : str
+        What to do when the queue is full, see `OverflowPolicy`.
+    drop_types : list
+        The kinds of items which may be dropped under `OverflowPolicy.DROP_TYPE`.
+    name : str
+        Used when logging.
+    """
+    def __init__(self, handler, size=10000, workers=1, policy=OverflowPolicy.BLOCK, drop_types=None, name='ingest'):
+        super(IngestQueue, self).__init__()
+        self.handler = handler
+        self.size = size
+        self.workers = workers
+        self.policy = policy
+        self.drop_types = frozenset(drop_types or ())
+        self.name = name
+
+        self.processed = 0
+        self.dropped = {}
+
+        # How long items sat in the queue before being picked up (seconds)
+        self.lag = Histogram(max_samples=1000)
+
+        self._queue = deque()
+        self._not_empty = gevent.event.Event()
+        self._not_full = gevent.event.Event()
+        self._not_full.set()
+        self._tasks = []
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    @property
+    def current_lag(self):
+        """
+        How long (in seconds) the oldest queued item has been waiting.
+        """
+        return time.monotonic() - self._queue[0][0] if self._queue else 0
+
+    @property
+    def metrics(self):
+        return {
+            'depth': self.depth,
+            'lag': self.current_lag,
+            'lag_summary': self.lag.summary(),
+            'processed': self.processed,
+            'dropped': dict(self.dropped),
+        }
+
+    def _drop(self, kind):
+        self.dropped[kind] = self.dropped.get(kind, 0) + 1
+        if sum(self.dropped.values()) % 1000 == 1:
+            self.log.warning('%s queue is full (%s items), dropping %s', self.name, self.size, kind)
+
+    def _make_room(self, kind):
+        """
+        Returns False if the incoming item should be dropped instead.
+        """
+        while len(self._queue) >= self.size:
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                self._drop(self._queue.popleft()[1])
+                continue
+
+            if self.policy == OverflowPolicy.DROP_TYPE:
+                if kind in self.drop_types:
+                    self._drop(kind)
+                    return False
+
+                for index, (_, queued_kind, _) in enumerate(self._queue):
+                    if queued_kind in self.drop_types:
+                        del self._queue[index]
+                        self._drop(queued_kind)
+                        break
+                else:
+                    self._wait_for_room()
+                continue
+
+            self._wait_for_room()
+
+        return True
+
+    def _wait_for_room(self):
+        self._not_full.clear()
+        self._not_full.wait()
+
+    def put(self, item, kind=None):
+        """
+        Queues an item, applying the overflow policy if the queue is full.
+        """
+        if not self._make_room(kind):
+            return False
+
+        self._queue.append((time.monotonic(), kind, item))
+        self._not_empty.set()
+        return True
+
+    def _worker(self):
+        queue = self._queue
+        while True:
+            if not queue:
+                self._not_empty.clear()
+                self._not_empty.wait()
+                continue
+
+            queued_at, kind, item = queue.popleft()
+            self._not_full.set()
+            self.lag.add(time.monotonic() - queued_at)
+
+            try:
+                self.handler(item)
+            except Exception:
+                self.log.exception('Failed to handle %s item (%s): ', self.name, kind)
+
+            self.processed += 1
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [gevent.spawn(self._worker) for _ in range(self.workers)]
+        return self
+
+    def clear(self):
+        self._queue.clear()
+        self._not_full.set()
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.kill()
+        self._tasks = []
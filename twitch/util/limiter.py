@@ -1,4 +1,5 @@
 import gevent
+import gevent.lock
 
 
 class SimpleLimiter:
@@ -11,11 +12,13 @@ class SimpleLimiter:
         self.reset_at = 0
         self.event = None
 
-    def check(self):
-        self._lock.acquire()
+    def check(self, blocking=True):
+        if not self._lock.acquire(blocking=blocking):
+            return False
 
         def _release_lock():
             gevent.sleep(self.per)
             self._lock.release()
 
         gevent.spawn(_release_lock)
+        return True
@@ -0,0 +1,54 @@
+from collections import deque
+
+
+class Histogram:
+    """
+    Collects numeric samples (e.g. latencies) and summarizes them as
+    percentiles. Only the most recent `max_samples` are kept, if given.
+    """
+    __slots__ = ['samples', 'count', 'total']
+
+    def __init__(self, max_samples=None):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def clear(self):
+        self.samples.clear()
+        self.count = 0
+        self.total = 0
+
+    def percentile(self, pct, _sorted=None):
+        values = _sorted if _sorted is not None else sorted(self.samples)
+        if not values:
+            return None
+
+        # Nearest-rank, good enough for reporting
+        index = min(len(values) - 1, max(0, int(round(pct / 100.0 * len(values))) - 1))
+        return values[index]
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Returns the sample count, mean, min/max and the given percentiles (over
+        the retained samples) as a dict.
+        """
+        values = sorted(self.samples)
+        result = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': values[0] if values else None,
+            'max': values[-1] if values else None,
+        }
+
+        for pct in percentiles:
+            result['p{}'.format(pct)] = self.percentile(pct, values)
+
+        return result